@@ -4,21 +4,25 @@ MovesCalculator class.
 
 # =============================================================================
 
-from functools import partial
-from typing import Dict, Iterator, List, Optional, Tuple
+import functools
+from typing import Dict, Optional, Tuple
 
 from alicechess.pieces import King, Pawn, Piece, Rook
 from alicechess.position import BoardPosition, Position
-from alicechess.utils import Color, PieceType, check_brc, check_brc_bool
+from alicechess.utils import Color, PieceType, check_brc
 
 # =============================================================================
 
-BoardDict = Dict[BoardPosition, Piece]
+# maps: board index (see `board_index()`) -> piece
+BoardDict = Dict[int, Piece]
 
 # Whether white can castle (kingside and queenside) and whether black
 # can castle (kingside and queenside).
 CastlingAbilityTuple = Tuple[Tuple[bool, bool], Tuple[bool, bool]]
 
+# A sequence of (row, column) squares.
+SquaresTuple = Tuple[Tuple[int, int], ...]
+
 # =============================================================================
 
 STRAIGHT_DIRS = (
@@ -49,115 +53,353 @@ KNIGHT_MOVES = (
 )
 
 
-def _yield_pos(directions, pr, pc, steps=None) -> Iterator[Tuple[int, int]]:
-    for dr, dc in directions:
-        r = pr
-        c = pc
-        i = 0
-        while steps is None or i < steps:
-            r += dr
-            c += dc
-            if not check_brc_bool(r=r, c=c):
-                break
-            stop = yield r, c
-            if stop:
-                # last yield for send
-                yield None
-                break
-            i += 1
+def _make_step_targets(deltas) -> Tuple[SquaresTuple, ...]:
+    """Returns the in-bounds targets of a single step in each of the
+    given directions, indexed by square (`r * 8 + c`).
+    """
+    return tuple(
+        tuple(
+            (r + dr, c + dc)
+            for dr, dc in deltas
+            if 0 <= r + dr < 8 and 0 <= c + dc < 8
+        )
+        for r in range(8)
+        for c in range(8)
+    )
 
 
-yield_straight_pos = partial(_yield_pos, STRAIGHT_DIRS)
-yield_diagonal_pos = partial(_yield_pos, DIAGONAL_DIRS)
-yield_all_dir_pos = partial(_yield_pos, ALL_DIRS)
-yield_knight_pos = partial(_yield_pos, KNIGHT_MOVES, steps=1)
+def _make_rays(directions) -> Tuple[Tuple[SquaresTuple, ...], ...]:
+    """Returns the in-bounds squares along each of the given directions
+    (in step order), indexed by square (`r * 8 + c`).
+    """
+    rays_by_square = []
+    for r in range(8):
+        for c in range(8):
+            rays = []
+            for dr, dc in directions:
+                ray = []
+                tr = r + dr
+                tc = c + dc
+                while 0 <= tr < 8 and 0 <= tc < 8:
+                    ray.append((tr, tc))
+                    tr += dr
+                    tc += dc
+                rays.append(tuple(ray))
+            rays_by_square.append(tuple(rays))
+    return tuple(rays_by_square)
+
+
+KNIGHT_TARGETS = _make_step_targets(KNIGHT_MOVES)
+KING_TARGETS = _make_step_targets(ALL_DIRS)
+
+# the targets as bitboards, for testing all of them at once
+KNIGHT_MASKS = tuple(
+    sum(1 << (r * 8 + c) for r, c in targets) for targets in KNIGHT_TARGETS
+)
+KING_MASKS = tuple(
+    sum(1 << (r * 8 + c) for r, c in targets) for targets in KING_TARGETS
+)
+
+# maps: color value -> square -> the squares that a pawn of that color
+#   would attack the square from (white pawns attack upwards, so they
+#   attack from the row below)
+PAWN_ATTACKERS_FROM = (
+    _make_step_targets(((1, -1), (1, 1))),
+    _make_step_targets(((-1, -1), (-1, 1))),
+)
+# maps: color value -> square -> the squares that a pawn of that color
+#   on that square attacks, as a bitboard
+PAWN_ATTACK_MASKS = tuple(
+    tuple(sum(1 << (r * 8 + c) for r, c in targets) for targets in attacked)
+    for attacked in (PAWN_ATTACKERS_FROM[1], PAWN_ATTACKERS_FROM[0])
+)
+# maps: color value -> square -> the squares that a pawn of that color
+#   would attack the square from, as a bitboard
+PAWN_ATTACKER_MASKS = (PAWN_ATTACK_MASKS[1], PAWN_ATTACK_MASKS[0])
+
+STRAIGHT_RAYS = _make_rays(STRAIGHT_DIRS)
+DIAGONAL_RAYS = _make_rays(DIAGONAL_DIRS)
+ALL_DIR_RAYS = _make_rays(ALL_DIRS)
+
+# the rays as bitboards, indexed the same way
+STRAIGHT_RAY_MASKS = tuple(
+    tuple(sum(1 << (r * 8 + c) for r, c in ray) for ray in rays)
+    for rays in STRAIGHT_RAYS
+)
+DIAGONAL_RAY_MASKS = tuple(
+    tuple(sum(1 << (r * 8 + c) for r, c in ray) for ray in rays)
+    for rays in DIAGONAL_RAYS
+)
 
 
-POS_GEN_FUNCS = {
-    PieceType.KING: partial(yield_all_dir_pos, steps=1),
-    PieceType.QUEEN: yield_all_dir_pos,
-    PieceType.ROOK: yield_straight_pos,
-    PieceType.KNIGHT: yield_knight_pos,
-    PieceType.BISHOP: yield_diagonal_pos,
-}
+def _make_ray_scans(directions, ray_masks_by_square):
+    """Pairs each ray bitboard with whether its direction goes toward
+    higher squares (`r * 8 + c`), which decides whether the first piece
+    along the ray is the lowest or the highest set bit.
+    """
+    increasing = tuple(dr * 8 + dc > 0 for dr, dc in directions)
+    return tuple(
+        tuple(zip(ray_masks, increasing)) for ray_masks in ray_masks_by_square
+    )
+
+
+# maps: square -> direction index -> (ray bitboard, increasing)
+STRAIGHT_RAY_SCANS = _make_ray_scans(STRAIGHT_DIRS, STRAIGHT_RAY_MASKS)
+DIAGONAL_RAY_SCANS = _make_ray_scans(DIAGONAL_DIRS, DIAGONAL_RAY_MASKS)
+
+# all the squares of a single board
+ALL_SQUARES_MASK = (1 << 64) - 1
+
+# maps: piece type index (see `_TYPE_INDEX`) -> square -> rays of
+#   targets, where each ray stops at the first piece in the way (single
+#   steps are rays of length 1)
+PIECE_RAYS = tuple(
+    {
+        PieceType.KING: tuple(
+            tuple((target,) for target in targets) for targets in KING_TARGETS
+        ),
+        PieceType.QUEEN: ALL_DIR_RAYS,
+        PieceType.ROOK: STRAIGHT_RAYS,
+        PieceType.KNIGHT: tuple(
+            tuple((target,) for target in targets)
+            for targets in KNIGHT_TARGETS
+        ),
+        PieceType.BISHOP: DIAGONAL_RAYS,
+    }.get(piece_type)
+    for piece_type in PieceType
+)
+
+# maps: piece type index (see `_TYPE_INDEX`) -> the ray scans a sliding
+#   piece moves along
+SLIDER_RAY_SCANS = tuple(
+    {
+        PieceType.QUEEN: (STRAIGHT_RAY_SCANS, DIAGONAL_RAY_SCANS),
+        PieceType.ROOK: (STRAIGHT_RAY_SCANS,),
+        PieceType.BISHOP: (DIAGONAL_RAY_SCANS,),
+    }.get(piece_type)
+    for piece_type in PieceType
+)
+
+# maps: piece type index (see `_TYPE_INDEX`) -> square -> bitboard of
+#   all the squares along the rays
+PIECE_SPANS = tuple(
+    None
+    if rays_by_square is None
+    else tuple(
+        sum(1 << (r * 8 + c) for ray in rays for r, c in ray)
+        for rays in rays_by_square
+    )
+    for rays_by_square in PIECE_RAYS
+)
 
 # =============================================================================
 
+# bind the enum members used in the hot loops, to avoid repeated
+# attribute lookups
+_KING = PieceType.KING
+_PAWN = PieceType.PAWN
+
+# maps: piece type -> index into the per-color bitboards
+_TYPE_INDEX = {piece_type: i for i, piece_type in enumerate(PieceType)}
+_KING_INDEX = _TYPE_INDEX[PieceType.KING]
+_QUEEN_INDEX = _TYPE_INDEX[PieceType.QUEEN]
+_ROOK_INDEX = _TYPE_INDEX[PieceType.ROOK]
+_KNIGHT_INDEX = _TYPE_INDEX[PieceType.KNIGHT]
+_BISHOP_INDEX = _TYPE_INDEX[PieceType.BISHOP]
+_PAWN_INDEX = _TYPE_INDEX[PieceType.PAWN]
+
+# maps: piece FEN name -> (color value, piece type index)
+# (the FEN name is a plain string, so this is much cheaper than hashing
+# the color and type enums)
+_PIECE_INDICES = {
+    (piece_type.value if color is Color.WHITE else piece_type.value.lower()): (
+        color.value,
+        type_index,
+    )
+    for color in Color
+    for piece_type, type_index in _TYPE_INDEX.items()
+}
+
+
+def board_index(bn: int, r: int, c: int) -> int:
+    """Returns the flat index of the given position, which is used as
+    the key of a `BoardDict`.
+    """
+    return bn * 64 + r * 8 + c
+
 
 def _get(board: BoardDict, bn: int, r: int, c: int):
-    return board.get((bn, r, c), None)
+    return board.get(bn * 64 + r * 8 + c, None)
+
+
+class _Bitboards:
+    """A bitboard representation of both boards.
+
+    Each board has an occupancy bitboard, where bit `r * 8 + c` is set
+    if there is a piece at that square, and a bitboard for each color
+    and piece type. The pieces themselves are kept in a flat list per
+    board, so they are only looked up once a bitboard says there is
+    something there.
+    """
+
+    def __init__(self, board: Optional[BoardDict] = None):
+        # maps: board number -> occupancy bitboard
+        self.occ = [0, 0]
+        # maps: board number -> color -> piece type index -> bitboard
+        self.bb = ([[0] * 6, [0] * 6], [[0] * 6, [0] * 6])
+        # maps: board number -> square -> piece
+        self.pieces = ([None] * 64, [None] * 64)
+        if board is not None:
+            for piece in board.values():
+                self.put(*piece.pos, piece)
+
+    def get(self, bn: int, r: int, c: int) -> Optional[Piece]:
+        """Returns the piece at the given position, or None."""
+        sq = r * 8 + c
+        if not (self.occ[bn] >> sq) & 1:
+            return None
+        return self.pieces[bn][sq]
+
+    def put(self, bn: int, r: int, c: int, piece: Piece):
+        """Puts the given piece at the given (empty) position."""
+        sq = r * 8 + c
+        bit = 1 << sq
+        color_index, type_index = _PIECE_INDICES[piece.fen_name]
+        self.occ[bn] |= bit
+        self.bb[bn][color_index][type_index] |= bit
+        self.pieces[bn][sq] = piece
+
+    def remove(self, bn: int, r: int, c: int) -> Optional[Piece]:
+        """Removes and returns the piece at the given position, or None
+        if there is no piece there.
+        """
+        sq = r * 8 + c
+        bit = 1 << sq
+        if not self.occ[bn] & bit:
+            return None
+        piece = self.pieces[bn][sq]
+        color_index, type_index = _PIECE_INDICES[piece.fen_name]
+        self.occ[bn] ^= bit
+        self.bb[bn][color_index][type_index] ^= bit
+        self.pieces[bn][sq] = None
+        return piece
 
 
 # =============================================================================
 
 
-def _yield_threatened_by(
-    board: BoardDict, by_color: Color, bn: int, r: int, c: int
-) -> Iterator[Piece]:
-    """Yields the pieces that the given position is threatened by."""
+def _is_threatened(
+    board: _Bitboards, by_color: Color, bn: int, r: int, c: int
+) -> bool:
+    """Returns whether the given position is threatened by the given
+    color.
+
+    A position is threatened if a piece of that color could capture on
+    it, so a position with a piece of that color is never threatened.
+    Checks the cheapest attackers first and returns as soon as one is
+    found.
+    """
     check_brc(bn, r, c)
 
-    piece_at_pos = _get(board, bn, r, c)
+    piece_at_pos = board.get(bn, r, c)
     if piece_at_pos is not None:
         if piece_at_pos.color is by_color:
             # own piece can't be threatened
-            return
+            return False
 
-    # check knight positions
-    for tr, tc in yield_knight_pos(r, c):
-        piece = _get(board, bn, tr, tc)
-        if piece is None or piece.color is not by_color:
-            continue
-        if piece.type is PieceType.KNIGHT:
-            yield piece
+    pos_sq = r * 8 + c
+    by_bbs = board.bb[bn][by_color.index]
 
     # check pawn positions
-    if by_color is Color.WHITE:
-        # threaten from bottom
-        dr = 1
-    else:
-        # threaten from top
-        dr = -1
-    for dc in (-1, 1):
-        piece = _get(board, bn, r + dr, c + dc)
-        if piece is None or piece.color is not by_color:
-            continue
-        if piece.type is PieceType.PAWN:
-            yield piece
+    if PAWN_ATTACKER_MASKS[by_color.index][pos_sq] & by_bbs[_PAWN_INDEX]:
+        return True
+
+    # check knight positions
+    if KNIGHT_MASKS[pos_sq] & by_bbs[_KNIGHT_INDEX]:
+        return True
 
     # check king positions
-    for tr, tc in POS_GEN_FUNCS[PieceType.KING](r, c):
-        piece = _get(board, bn, tr, tc)
-        if piece is None or piece.color is not by_color:
-            continue
-        if piece.type is PieceType.KING:
-            yield piece
+    if KING_MASKS[pos_sq] & by_bbs[_KING_INDEX]:
+        return True
 
     # check straights and diagonals
-    for pos_gen_func, piece_types in (
-        (yield_straight_pos, (PieceType.QUEEN, PieceType.ROOK)),
-        (yield_diagonal_pos, (PieceType.QUEEN, PieceType.BISHOP)),
+    occ = board.occ[bn]
+    queens = by_bbs[_QUEEN_INDEX]
+    for ray_scans, attackers in (
+        (STRAIGHT_RAY_SCANS, queens | by_bbs[_ROOK_INDEX]),
+        (DIAGONAL_RAY_SCANS, queens | by_bbs[_BISHOP_INDEX]),
     ):
-        pos_gen = pos_gen_func(r, c)
-        for tr, tc in pos_gen:
-            piece = _get(board, bn, tr, tc)
-            if piece is None:
+        if not attackers:
+            continue
+        for ray_mask, increasing in ray_scans[pos_sq]:
+            if not ray_mask & attackers:
                 continue
-            if piece.color is by_color and piece.type in piece_types:
-                yield piece
-            # done with this direction
-            pos_gen.send(True)
+            # only the first piece along the ray can be an attacker
+            blockers = occ & ray_mask
+            if increasing:
+                first = blockers & -blockers
+            else:
+                first = 1 << (blockers.bit_length() - 1)
+            if first & attackers:
+                return True
 
+    return False
 
-def _is_threatened(
-    board: BoardDict, by_color: Color, bn: int, r: int, c: int
-) -> bool:
-    try:
-        next(_yield_threatened_by(board, by_color, bn, r, c))
-        return True
-    except StopIteration:
-        # nothing yielded
-        return False
+
+def _calc_ray_moves(
+    rays: Tuple[SquaresTuple, ...], occ: int, blocked: int, other_occ: int
+) -> Tuple[int, Tuple[Tuple[int, int, Position], ...], frozenset[Position]]:
+    """Returns the targets along the given rays, without checking
+    whether the moves leave the king in check.
+
+    Args:
+        rays (Tuple[SquaresTuple, ...]): The rays to move along.
+        occ (int): The occupied squares on the piece's board.
+        blocked (int): The squares on the piece's board that can't be
+            captured.
+        other_occ (int): The occupied squares on the other board.
+
+    Returns:
+        Tuple[int, Tuple[Tuple[int, int, Position], ...], frozenset]:
+            The targets as a bitboard, the targets with their rows and
+            columns, and the targets as a set.
+    """
+    targets_mask = 0
+    targets = []
+    for ray in rays:
+        for r, c in ray:
+            bit = 1 << (r * 8 + c)
+            if blocked & bit:
+                break
+            if not other_occ & bit:
+                targets_mask |= bit
+                targets.append((r, c, Position(r, c)))
+            if occ & bit:
+                # done with this direction
+                break
+    return (
+        targets_mask,
+        tuple(targets),
+        frozenset(target for _, _, target in targets),
+    )
+
+
+# the most results of `_ray_moves()` to keep around
+RAY_MOVES_CACHE_SIZE = 8192
+
+
+@functools.lru_cache(maxsize=RAY_MOVES_CACHE_SIZE)
+def _ray_moves(
+    type_index: int, sq: int, occ: int, blocked: int, other_occ: int
+) -> Tuple[int, Tuple[Tuple[int, int, Position], ...], frozenset[Position]]:
+    """Returns `_calc_ray_moves()` for the rays of the given piece type
+    on the given square.
+
+    The result only depends on the arguments, so it is shared between
+    all pieces, games, and calculators. The cache is bounded so that it
+    doesn't keep growing over many games.
+    """
+    return _calc_ray_moves(PIECE_RAYS[type_index][sq], occ, blocked, other_occ)
 
 
 # =============================================================================
@@ -188,22 +430,44 @@ class MovesCalculator:
         en_passant_pawn: Optional[Pawn] = None,
     ):
         self._board = board
+        # drive all the lookups from the bitboards
+        self._bitboards = _Bitboards(board)
+        # maps: board number -> color -> occupancy bitboard
+        self._color_occ = tuple(
+            tuple(
+                bbs[0] | bbs[1] | bbs[2] | bbs[3] | bbs[4] | bbs[5]
+                for bbs in board_bbs
+            )
+            for board_bbs in self._bitboards.bb
+        )
         self._kings = tuple(kings)
+        # maps: color -> pieces of that color
+        self._pieces_by_color = ([], [])
+        for piece in board.values():
+            self._pieces_by_color[piece.color.index].append(piece)
 
-        pawns: Tuple[List[Pawn]] = ([], [])
-        for piece in self._board.values():
-            if piece.type is PieceType.PAWN:
-                pawns[piece.color.value].append(piece)
+        # maps: color -> board number -> bitboard of attacked squares
+        # (only valid for the unmodified board)
+        self._attacked = (
+            self._compute_attack_map(Color.WHITE),
+            self._compute_attack_map(Color.BLACK),
+        )
 
         self._in_check = tuple(
-            _is_threatened(self._board, king.color.other(), *king.pos)
+            self._is_attacked(king.color.other_color, *king.pos)
             for king in self._kings
         )
         if self._in_check == (True, True):
             raise ValueError("Both kings are in check")
+
+        # maps: color -> bitboard of the squares on the king's board
+        #   where moving or capturing a piece might expose the king
+        self._pin_masks = tuple(
+            self._compute_pin_mask(king) for king in self._kings
+        )
         self._num_moves = [0, 0]
 
-        # maps: pos -> possible moves
+        # maps: board index -> possible moves
         self._possible_moves = {}
         # maps: king id -> column the king moves to
         self._castles = {}
@@ -213,8 +477,8 @@ class MovesCalculator:
         # calculate all the possible moves
         for piece in self._board.values():
             moves = self._calc_possible(piece)
-            self._possible_moves[piece.pos] = moves
-            self._num_moves[piece.color.value] += len(moves)
+            self._possible_moves[board_index(*piece.pos)] = moves
+            self._num_moves[piece.color.index] += len(moves)
 
         # check for castling
         for (
@@ -236,13 +500,16 @@ class MovesCalculator:
 
         # check for en passant
         if en_passant_pawn is not None:
-            if en_passant_pawn.type is not PieceType.PAWN:
+            if en_passant_pawn.type is not _PAWN:
                 raise ValueError("Given en passant piece is not a pawn")
             pbn, pr, pc = en_passant_pawn.pos
             if pbn != 1:
                 raise ValueError("Given en passant pawn is not on Board B")
             # see if any of the enemy's pawns can perform en passant
-            for pawn in pawns[en_passant_pawn.color.other().value]:
+            enemy_color = en_passant_pawn.color.other_color
+            for pawn in self._pieces_by_color[enemy_color.index]:
+                if pawn.type is not _PAWN:
+                    continue
                 bn, r, c = pawn.pos
                 if bn != 1:
                     # cannot capture a piece on the other board
@@ -252,7 +519,10 @@ class MovesCalculator:
                     continue
                 capture_r = r + pawn.dr
                 capture_pos = (capture_r, pc)
-                if any((bn, *capture_pos) in self._board for bn in range(2)):
+                if (
+                    board_index(0, capture_r, pc) in self._board
+                    or board_index(1, capture_r, pc) in self._board
+                ):
                     # there's a piece there; no en passant
                     continue
                 if self._move_in_check(
@@ -260,7 +530,7 @@ class MovesCalculator:
                 ):
                     continue
                 self._en_passant[pawn.id] = (pc, en_passant_pawn.id)
-                self._num_moves[pawn.color.value] += 1
+                self._num_moves[pawn.color.index] += 1
 
     def assign_moves_to_pieces(self, board: BoardDict):
         """Assigns the calculated moves to the pieces in the given
@@ -278,37 +548,136 @@ class MovesCalculator:
         threatened_piece_ids = set()
         # assign moves to all the pieces
         for piece in board.values():
-            piece._set_possible_moves(self._possible_moves[piece.pos])
+            # special moves
+            special_targets = ()
+            if piece.type is _KING:
+                if piece.id in self._castles:
+                    special_targets = (
+                        piece._castle_target(self._castles[piece.id]),
+                    )
+            elif piece.type is _PAWN:
+                if piece.id in self._en_passant:
+                    c, threatened_pawn_id = self._en_passant[piece.id]
+                    special_targets = (piece._en_passant_target(c),)
+                    threatened_piece_ids.add(threatened_pawn_id)
+
+            piece._set_possible_moves(
+                self._possible_moves[board_index(*piece.pos)],
+                special_targets,
+            )
 
             # find threatened pieces
+            # (the special moves always go to empty squares, so they
+            # don't threaten anything on their target)
             for move in piece.yield_moves():
                 threatened_piece = _get(board, *move.capture_pos)
                 if threatened_piece is not None:
                     threatened_piece_ids.add(threatened_piece.id)
-
-            # add special moves
-            if piece.type is PieceType.KING:
-                if piece.id in self._castles:
-                    piece._add_castle(self._castles[piece.id])
-            elif piece.type is PieceType.PAWN:
-                if piece.id in self._en_passant:
-                    c, threatened_pawn_id = self._en_passant[piece.id]
-                    piece._add_en_passant(c)
-                    threatened_piece_ids.add(threatened_pawn_id)
         # mark all threatened pieces as threatened or not
         for piece in board.values():
             piece._mark_threatened(piece.id in threatened_piece_ids)
 
     def _get(self, bn: int, r: int, c: int) -> Optional[Piece]:
-        return _get(self._board, bn, r, c)
+        return self._bitboards.get(bn, r, c)
+
+    def _compute_attack_map(self, color: Color) -> Tuple[int, int]:
+        """Returns the squares attacked by the given color on each
+        board, as bitboards.
+        """
+        occ = self._bitboards.occ
+        attacked = [0, 0]
+        pawn_attack_masks = PAWN_ATTACK_MASKS[color.index]
+        for piece in self._pieces_by_color[color.index]:
+            bn, r, c = piece.pos
+            sq = r * 8 + c
+            _, type_index = _PIECE_INDICES[piece.fen_name]
+            if type_index == _PAWN_INDEX:
+                attacked[bn] |= pawn_attack_masks[sq]
+                continue
+            if type_index == _KING_INDEX:
+                attacked[bn] |= KING_MASKS[sq]
+                continue
+            if type_index == _KNIGHT_INDEX:
+                attacked[bn] |= KNIGHT_MASKS[sq]
+                continue
+            board_occ = occ[bn]
+            for ray_scans in SLIDER_RAY_SCANS[type_index]:
+                for d, (ray_mask, increasing) in enumerate(ray_scans[sq]):
+                    blockers = board_occ & ray_mask
+                    if blockers:
+                        if increasing:
+                            first = blockers & -blockers
+                        else:
+                            first = 1 << (blockers.bit_length() - 1)
+                        # the rest of the ray past the first piece is
+                        # blocked
+                        ray_mask ^= ray_scans[first.bit_length() - 1][d][0]
+                    attacked[bn] |= ray_mask
+        return tuple(attacked)
+
+    def _is_attacked(self, by_color: Color, bn: int, r: int, c: int) -> bool:
+        """Returns whether the given position is attacked by the given
+        color on the unmodified board.
+
+        Equivalent to `_is_threatened()` for empty squares and for
+        squares with a piece of the other color.
+        """
+        return bool((self._attacked[by_color.index][bn] >> (r * 8 + c)) & 1)
+
+    def _compute_pin_mask(self, king: King) -> int:
+        """Returns a bitboard of the squares on the king's board where
+        moving a piece away (or capturing a piece, which then teleports
+        away) could expose the king to an enemy rook, bishop, or queen.
+
+        These are all the squares on the rays from the king that have
+        such an attacker somewhere along them, which covers any pinned
+        pieces.
+        """
+        bn, r, c = king.pos
+        enemy_bbs = self._bitboards.bb[bn][king.color.other_color.index]
+        queens = enemy_bbs[_QUEEN_INDEX]
+        mask = 0
+        for ray_masks, attackers in (
+            (STRAIGHT_RAY_MASKS, queens | enemy_bbs[_ROOK_INDEX]),
+            (DIAGONAL_RAY_MASKS, queens | enemy_bbs[_BISHOP_INDEX]),
+        ):
+            if not attackers:
+                continue
+            for ray_mask in ray_masks[r * 8 + c]:
+                if ray_mask & attackers:
+                    mask |= ray_mask
+        return mask
+
+    def _check_mask(self, piece: Piece) -> int:
+        """Returns a bitboard of the targets (on the piece's board) that
+        need a full `_move_in_check()` test.
+
+        Moving to any other target is known to not leave the king in
+        check: the piece isn't the king, the king isn't already in
+        check, and either the king is on the other board (where the
+        piece can only block attacks after teleporting) or neither the
+        piece nor the captured piece could be shielding the king.
+        """
+        color = piece.color.index
+        king = self._kings[color]
+        if piece is king or self._in_check[color]:
+            return ALL_SQUARES_MASK
+        bn, r, c = piece.pos
+        if bn != king.pos.bn:
+            return 0
+        pin_mask = self._pin_masks[color]
+        if (pin_mask >> (r * 8 + c)) & 1:
+            # the piece might be pinned
+            return ALL_SQUARES_MASK
+        return pin_mask
 
     def num_moves(self, color: Color) -> int:
         """Returns the number of moves for the given color."""
-        return self._num_moves[color.value]
+        return self._num_moves[color.index]
 
     def is_in_check(self, color: Color) -> bool:
         """Returns whether the given color is in check."""
-        return self._in_check[color.value]
+        return self._in_check[color.index]
 
     def _move_in_check(
         self,
@@ -316,7 +685,10 @@ class MovesCalculator:
         target: Position,
         en_passant: Optional[Position] = None,
     ):
-        pos = BoardPosition.of(pos)
+        # callers almost always pass a piece's position already
+        # pylint: disable-next=unidiomatic-typecheck
+        if type(pos) is not BoardPosition:
+            pos = BoardPosition.of(pos)
         tr, tc = target
         here_target_pos = (pos.bn, tr, tc)
         there_target_pos = (1 - pos.bn, tr, tc)
@@ -325,114 +697,128 @@ class MovesCalculator:
         if moving is None:
             raise ValueError(f"No piece at position {pos} {pos.pos}")
 
-        # make temp copy board (no need to copy pieces because not
-        # changing them)
-        board = dict(self._board)
+        board = self._bitboards
 
         # check move validity
         if en_passant is None:
-            captured = _get(board, *here_target_pos)
+            captured_pos = here_target_pos
+            captured = board.get(*captured_pos)
             if captured is not None:
-                if captured.type is PieceType.KING:
+                if captured.type is _KING:
                     raise ValueError("Move captures a king")
                 if captured.color is moving.color:
                     raise ValueError("Move captures own piece")
         else:
             # capture the en passant piece
-            captured = board.pop((pos.bn, *en_passant), None)
+            captured_pos = (pos.bn, *en_passant)
+            captured = board.get(*captured_pos)
             if captured is None:
                 raise ValueError("Given en passant position is blank")
-            if captured.type is not PieceType.PAWN:
+            if captured.type is not _PAWN:
                 raise ValueError("Cannot perform en passant on a non-pawn")
             if captured.color is moving.color:
                 raise ValueError("En passant captures own piece")
-        other_board = _get(board, *there_target_pos)
+        other_board = board.get(*there_target_pos)
         if other_board is not None:
             raise ValueError("Move squashes a piece on the other board")
 
-        enemy_color = moving.color.other()
-        king = self._kings[moving.color.value]
+        enemy_color = moving.color.other_color
+        king = self._kings[moving.color.index]
+        king_pos = king.pos
         moving_king = moving is king
-
-        # make sure move is valid on current board
-        board[here_target_pos] = board.pop(pos).move_to(here_target_pos)
-        if moving_king:
-            check_pos = here_target_pos
-        else:
-            check_pos = king.pos
-        if moving_king or pos.bn == king.pos.bn:
-            # if the king is moving, can't move into check
-            # otherwise, if on the same board as the king, can't let the
-            # king be in check
-            if _is_threatened(board, enemy_color, *check_pos):
+        remove = board.remove
+        put = board.put
+        is_threatened = _is_threatened
+
+        # make the move on the board itself and undo it afterwards (no
+        # need to copy anything because the pieces aren't changed)
+        # note: these probes aren't memoized, since every probe is on a
+        # different placement (threats on the real board are already
+        # answered by the attack maps)
+        if captured is not None:
+            remove(*captured_pos)
+        remove(*pos)
+        put(*here_target_pos, moving)
+        moved_pos = here_target_pos
+        try:
+            # make sure move is valid on current board
+            if moving_king:
+                check_pos = here_target_pos
+            else:
+                check_pos = king_pos
+            if moving_king or pos.bn == king_pos.bn:
+                # if the king is moving, can't move into check
+                # otherwise, if on the same board as the king, can't let
+                # the king be in check
+                if is_threatened(board, enemy_color, *check_pos):
+                    return True
+            # make sure move is valid after teleporting
+            remove(*here_target_pos)
+            put(*there_target_pos, moving)
+            moved_pos = there_target_pos
+            if moving_king:
+                check_pos = there_target_pos
+            else:
+                check_pos = king_pos
+            if is_threatened(board, enemy_color, *check_pos):
                 return True
-        # make sure move is valid after teleporting
-        board[there_target_pos] = board.pop(here_target_pos).move_to(
-            there_target_pos
-        )
-        if moving_king:
-            check_pos = there_target_pos
-        else:
-            check_pos = king.pos
-        if _is_threatened(board, enemy_color, *check_pos):
-            return True
 
-        return False
+            return False
+        finally:
+            # undo the move
+            remove(*moved_pos)
+            put(*pos, moving)
+            if captured is not None:
+                put(*captured_pos, captured)
 
     def _calc_possible_pawn(self, piece: Pawn) -> frozenset[Position]:
         bn, pr, pc = piece.pos
+        check_mask = self._check_mask(piece)
+        get = self._bitboards.get
         moves = set()
 
         def check_pos(r, c):
-            if not check_brc_bool(r=r, c=c):
-                return
-            this_board = self._get(bn, r, c)
-            if this_board is not None:
-                return
-            other_board = self._get(1 - bn, r, c)
-            if other_board is not None:
-                return
-            if self._move_in_check(piece.pos, (r, c)):
-                return
+            if (check_mask >> (r * 8 + c)) & 1:
+                if self._move_in_check(piece.pos, (r, c)):
+                    return
             moves.add(Position(r, c))
 
         r = pr + piece.dr
 
-        if not check_brc_bool(r=r):
+        if not 0 <= r < 8:
             # row is out of bounds; the pawn is on the promotion rank
             return frozenset()
 
         # forward
-        c = pc
-        check_pos(r, c)
-        if piece.is_at_start_pos() and self._get(bn, r, c) is None:
-            # check double forward
-            check_pos(r + piece.dr, c)
+        if get(bn, r, pc) is None:
+            if get(1 - bn, r, pc) is None:
+                check_pos(r, pc)
+            if piece.is_at_start_pos():
+                # check double forward
+                r2 = r + piece.dr
+                if get(bn, r2, pc) is None and get(1 - bn, r2, pc) is None:
+                    check_pos(r2, pc)
 
         # diagonal capture
         for dc in (-1, 1):
             c = pc + dc
-            if not check_brc_bool(c=c):
+            if not 0 <= c < 8:
                 continue
-            front_diag = self._get(bn, r, c)
-            if front_diag is None:
+            this_board = get(bn, r, c)
+            if this_board is None:
                 # must have a piece there
                 continue
-            this_board = self._get(bn, r, c)
-            if this_board is not None:
-                if this_board.type is PieceType.KING:
-                    # can't capture a king
-                    continue
-                if this_board.color is piece.color:
-                    # can't capture your own piece
-                    continue
-            other_board = self._get(1 - bn, r, c)
+            if this_board.type is _KING:
+                # can't capture a king
+                continue
+            if this_board.color is piece.color:
+                # can't capture your own piece
+                continue
+            other_board = get(1 - bn, r, c)
             if other_board is not None:
                 # can't replace on other board
                 continue
-            if self._move_in_check(piece.pos, (r, c)):
-                continue
-            moves.add(Position(r, c))
+            check_pos(r, c)
 
         return frozenset(moves)
 
@@ -442,30 +828,42 @@ class MovesCalculator:
                 f"Piece {piece.name!r} is not at the proper position "
                 f"({piece.pos}) in the board"
             )
-        if piece.type is PieceType.PAWN:
+        if piece.type is _PAWN:
             return self._calc_possible_pawn(piece)
-        bn, pr, pc = piece.pos
-        moves = set()
-        pos_gen = POS_GEN_FUNCS[piece.type](pr, pc)
-        for r, c in pos_gen:
-            this_board = self._get(bn, r, c)
-            if this_board is not None:
-                # done with this direction
-                pos_gen.send(True)
-                if this_board.type is PieceType.KING:
-                    # can't capture a king
-                    continue
-                if this_board.color is piece.color:
-                    # can't capture your own piece
-                    continue
-            other_board = self._get(1 - bn, r, c)
-            if other_board is not None:
-                # can't replace on other board
-                continue
-            if self._move_in_check(piece.pos, (r, c)):
-                continue
-            moves.add(Position(r, c))
-        return frozenset(moves)
+        piece_pos = piece.pos
+        bn, pr, pc = piece_pos
+        sq = pr * 8 + pc
+        color = piece.color.index
+        board = self._bitboards
+        _, type_index = _PIECE_INDICES[piece.fen_name]
+        span = PIECE_SPANS[type_index][sq]
+        # the moves only depend on what's in the piece's span on both
+        # boards, so they can be shared by every piece of this type on
+        # this square that sees the same surroundings
+        occ = board.occ[bn] & span
+        # can't capture your own piece or a king
+        blocked = (
+            self._color_occ[bn][color] | board.bb[bn][1 - color][_KING_INDEX]
+        ) & span
+        # can't replace on other board
+        other_occ = board.occ[1 - bn] & span
+        targets_mask, targets, moves = _ray_moves(
+            type_index, sq, occ, blocked, other_occ
+        )
+
+        check_mask = self._check_mask(piece)
+        if not check_mask & targets_mask:
+            # none of the moves could leave the king in check
+            return moves
+        move_in_check = self._move_in_check
+        return frozenset(
+            target
+            for r, c, target in targets
+            if not (
+                (check_mask >> (r * 8 + c)) & 1
+                and move_in_check(piece_pos, (r, c))
+            )
+        )
 
     def _calc_possible_castle(
         self,
@@ -479,7 +877,7 @@ class MovesCalculator:
         if not can_castle:
             return
 
-        enemy_color = king.color.other()
+        enemy_color = king.color.other_color
         bn, kr, kc = king.pos
         rc = rook.pos.c
 
@@ -493,13 +891,13 @@ class MovesCalculator:
         # check that all the spaces in the middle are empty
         c = kc + dc
         while c != rc:
-            if (bn, kr, c) in self._board:
+            if self._get(bn, kr, c) is not None:
                 # there's a piece there on this board
                 return
             if abs(c - kc) <= 2:
                 # the spaces being landed on must be empty on the other
                 # board as well
-                if (1 - bn, kr, c) in self._board:
+                if self._get(1 - bn, kr, c) is not None:
                     return
             c += dc
         # check that the spaces the king moves through are not
@@ -507,15 +905,15 @@ class MovesCalculator:
         c = kc
         for _ in range(2):
             c += dc
-            if _is_threatened(self._board, enemy_color, bn, kr, c):
+            if self._is_attacked(enemy_color, bn, kr, c):
                 return
         # check that the king does not teleport into check on the other
         # board
         # king should move two spaces
         king_c = kc + dc + dc
-        if _is_threatened(self._board, enemy_color, 1 - bn, kr, king_c):
+        if self._is_attacked(enemy_color, 1 - bn, kr, king_c):
             return
 
         # add castle move
         self._castles[king.id] = king_c
-        self._num_moves[king.color.value] += 1
+        self._num_moves[king.color.index] += 1
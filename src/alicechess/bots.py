@@ -5,7 +5,7 @@ Example random bots.
 # =============================================================================
 
 import random
-from typing import Dict
+from typing import Dict, Optional
 
 from alicechess.game_state import GameState
 from alicechess.player import Player
@@ -21,6 +21,17 @@ __all__ = (
 
 # =============================================================================
 
+PIECE_VALUES = {
+    PieceType.KING: 0,
+    PieceType.QUEEN: 8,
+    PieceType.ROOK: 5,
+    PieceType.KNIGHT: 3,
+    PieceType.BISHOP: 3,
+    PieceType.PAWN: 1,
+}
+
+# =============================================================================
+
 
 class RandomPlayer(Player):
     """A bot that picks a random move to make."""
@@ -38,6 +49,10 @@ class PrioritizedRandomPlayer(Player):
     that capture an enemy piece. Out of those priorities, it tries to
     not put the moved piece in a threatened position, and also tries to
     capture more valuable pieces.
+
+    Moves are tried in MVV-LVA order (most valuable victim, then least
+    valuable attacker), and the first move found that checkmates the
+    other king is played immediately.
     """
 
     def __init__(self, *args, **kwargs):
@@ -47,37 +62,39 @@ class PrioritizedRandomPlayer(Player):
         self._saved_promotions: Dict[int, PromoteType] = {}
 
     def make_move(self, game_state: GameState) -> Move:
-        PIECE_VALUES = {
-            PieceType.KING: 0,
-            PieceType.QUEEN: 8,
-            PieceType.ROOK: 5,
-            PieceType.KNIGHT: 3,
-            PieceType.BISHOP: 3,
-            PieceType.PAWN: 1,
-        }
+        def mvv_lva(move):
+            # most valuable victim, then least valuable attacker
+            victim = game_state.get_piece(*move.capture_pos)
+            victim_value = 0 if victim is None else PIECE_VALUES[victim.type]
+            return (-victim_value, PIECE_VALUES[move.piece_moved.type])
+
+        # try the most promising captures first
+        moves = sorted(game_state.yield_player_moves(), key=mvv_lva)
 
         max_weight = None
+        # the best moves, with the promotion each one was weighed with
         max_weight_moves = []
-        for move in game_state.yield_player_moves():
+        for move in moves:
             next_state = game_state.make_move(move)
             if next_state.needs_promotion():
                 # try every promotion
-                check_states = []
-                for promote_type in PromoteType:
-                    state = next_state.promote(promote_type)
-                    check_states.append(state)
-                    self._saved_promotions[state.id] = promote_type
+                check_states = [
+                    (next_state.promote(promote_type), promote_type)
+                    for promote_type in PromoteType
+                ]
             else:
-                check_states = [next_state]
+                check_states = [(next_state, None)]
+
+            for state, promote_type in check_states:
+                if state.is_in_checkmate():
+                    # can't do any better than winning
+                    return self._save_promotion(game_state, move, promote_type)
 
-            for state in check_states:
                 move_made = state.move
                 is_threatened = move_made.piece_moved.is_threatened
 
                 priority = 0
-                if state.is_in_checkmate():
-                    priority = 3
-                elif state.is_in_check():
+                if state.is_in_check():
                     priority = 2
                 elif move_made.move_captured:
                     priority = 1
@@ -90,14 +107,32 @@ class PrioritizedRandomPlayer(Player):
                 weight = (priority, 0 if is_threatened else 1, value)
                 if max_weight is None or weight > max_weight:
                     max_weight = weight
-                    max_weight_moves = [move]
+                    max_weight_moves = [(move, promote_type)]
                 elif weight == max_weight:
-                    max_weight_moves.append(move)
-
-        return random.choice(max_weight_moves)
+                    max_weight_moves.append((move, promote_type))
+
+        move, promote_type = random.choice(max_weight_moves)
+        return self._save_promotion(game_state, move, promote_type)
+
+    def _save_promotion(
+        self,
+        game_state: GameState,
+        move: Move,
+        promote_type: Optional[PromoteType],
+    ) -> Move:
+        """Saves the promotion that the given move was chosen with, if
+        any, and returns the move.
+
+        `GameState.step()` calls `promote()` with the same game state
+        that `make_move()` was called with, so the promotion is saved
+        under that state's id.
+        """
+        if promote_type is not None:
+            self._saved_promotions[game_state.id] = promote_type
+        return move
 
     def promote(self, game_state: GameState) -> PromoteType:
-        promote_type = self._saved_promotions.get(game_state.id, None)
+        promote_type = self._saved_promotions.pop(game_state.id, None)
         if promote_type is not None:
             return promote_type
         return PromoteType.by_index(random.randrange(len(PromoteType)))
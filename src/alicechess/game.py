@@ -4,10 +4,14 @@ Game class.
 
 # =============================================================================
 
-from typing import Type
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Type
 
 from alicechess.game_state import GameState
 from alicechess.player import AnyPlayer, _PlayerBase
+from alicechess.position import Move
+from alicechess.utils import PromoteType
 
 # =============================================================================
 
@@ -16,6 +20,31 @@ __all__ = ("Game",)
 # =============================================================================
 
 
+def _run_game_moves(
+    white: Type[AnyPlayer], black: Type[AnyPlayer]
+) -> List[Tuple[Move, Optional[PromoteType]]]:
+    """Runs a game between the given players until it's over, and
+    returns the moves that were made (with their promotions).
+
+    Game states link to the entire game history (and any states that
+    were looked ahead), so they are too deeply nested to be sent back
+    from another process. The moves are enough to replay the game.
+    """
+    state = GameState.new(white=white, black=black).run()
+    moves = []
+    while state.prev is not None:
+        move = state.move
+        prev = state.prev
+        promote_type = None
+        if prev.get_piece(*move.pos).type is not move.piece_moved.type:
+            # the pawn was promoted
+            promote_type = PromoteType(move.piece_moved.type)
+        moves.append((Move(move.pos, move.target), promote_type))
+        state = prev
+    moves.reverse()
+    return moves
+
+
 class Game:
     """Represents a game of Alice Chess."""
 
@@ -45,6 +74,52 @@ class Game:
         """Returns a new game."""
         return GameState.new(white=self._white, black=self._black)
 
+    def run_many(
+        self, num_games: int, max_workers: Optional[int] = None
+    ) -> List[GameState]:
+        """Runs multiple games until they're over.
+
+        The games are independent, so they are run in parallel in
+        separate processes, then replayed in this process so that the
+        returned states have their full history.
+
+        Args:
+            num_games (int): The number of games to run.
+            max_workers (Optional[int]): The maximum number of processes
+                to use. Defaults to the number of processors.
+
+        Raises:
+            RuntimeError: If either player is a human.
+
+        Returns:
+            List[GameState]: The last game state of each game.
+        """
+        if self._white.is_human or self._black.is_human:
+            raise RuntimeError("Cannot run games with a human player")
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            # make sure each process plays different games
+            initializer=random.seed,
+        ) as executor:
+            all_moves = list(
+                executor.map(
+                    _run_game_moves,
+                    [self._white] * num_games,
+                    [self._black] * num_games,
+                )
+            )
+
+        last_states = []
+        for moves in all_moves:
+            state = self.new()
+            for move, promote_type in moves:
+                state = state.make_move(move)
+                if promote_type is not None:
+                    state = state.promote(promote_type)
+            last_states.append(state)
+        return last_states
+
     def start_window(
         self, non_human_player_delay: int = None, debug: bool = None
     ):
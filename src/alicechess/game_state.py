@@ -6,8 +6,9 @@ GameState class.
 # =============================================================================
 
 import math
+import random
 from collections import Counter
-from itertools import count, zip_longest
+from itertools import compress, count, zip_longest
 from typing import Dict, Iterable, Iterator, Optional, Self, Tuple, Type
 
 from alicechess import pieces
@@ -15,11 +16,18 @@ from alicechess._moves_calculator import (
     BoardDict,
     CastlingAbilityTuple,
     MovesCalculator,
+    board_index,
 )
 from alicechess.pieces import Piece, make_promoted
 from alicechess.player import AnyPlayer
 from alicechess.position import Move, PieceMove, PieceMoved, Position
-from alicechess.utils import Color, EndGameState, PieceType, PromoteType
+from alicechess.utils import (
+    Color,
+    EndGameState,
+    PieceType,
+    PromoteType,
+    check_brc,
+)
 
 # =============================================================================
 
@@ -33,6 +41,76 @@ _PRIVATE_game_state_constructor_key = object()
 #   target) -> moves calculator
 _cached_calculators: Dict[Tuple, MovesCalculator] = {}
 
+# runs of empty squares in a FEN rank, longest first, and what they
+# collapse to
+_EMPTY_RUNS = tuple(("1" * n, str(n)) for n in range(8, 1, -1))
+# expands the empty square counts in a FEN rank to one "." per square
+_EXPAND_EMPTY = str.maketrans({str(n): "." * n for n in range(10)})
+
+
+def _fen_rank(squares: Iterable[Optional[Piece]]) -> str:
+    """Returns the FEN piece placement of a single rank."""
+    rank = "".join(
+        ["1" if piece is None else piece.fen_name for piece in squares]
+    )
+    for empty_run, num_empty in _EMPTY_RUNS:
+        rank = rank.replace(empty_run, num_empty)
+    return rank
+
+
+# maps: row difference + 7 -> column difference + 7 -> whether the two
+#   squares are the same or next to each other
+_IS_ADJACENT = tuple(
+    tuple(abs(dr) <= 1 and abs(dc) <= 1 for dc in range(-7, 8))
+    for dr in range(-7, 8)
+)
+
+# maps: king target column (when castling from its start position) ->
+#   (rook start column, rook end column)
+_CASTLE_ROOK_COLUMNS = {
+    # queenside castle
+    2: (0, 3),
+    # kingside castle
+    6: (7, 5),
+}
+
+# maps: FEN piece symbol (uppercase) -> piece class
+_PIECE_CLASSES: Dict[str, Type[Piece]] = {
+    "K": pieces.King,
+    "Q": pieces.Queen,
+    "R": pieces.Rook,
+    "N": pieces.Knight,
+    "B": pieces.Bishop,
+    "P": pieces.Pawn,
+}
+# maps: FEN piece symbol -> (piece class, color)
+_PIECE_SYMBOLS: Dict[str, Tuple[Type[Piece], Color]] = {
+    **{
+        symbol: (piece_cls, Color.WHITE)
+        for symbol, piece_cls in _PIECE_CLASSES.items()
+    },
+    **{
+        symbol.lower(): (piece_cls, Color.BLACK)
+        for symbol, piece_cls in _PIECE_CLASSES.items()
+    },
+}
+
+# zobrist hashing keys (seeded, so that the hashes are the same across
+# runs)
+_zobrist_random = random.Random(0)
+# maps: FEN piece symbol -> board index -> key
+_ZOBRIST_PIECES: Dict[str, Tuple[int, ...]] = {
+    symbol: tuple(_zobrist_random.getrandbits(64) for _ in range(128))
+    for symbol in _PIECE_SYMBOLS
+}
+# maps: castling ability bits (white kingside, white queenside, black
+#   kingside, black queenside) -> key
+_ZOBRIST_CASTLING = tuple(_zobrist_random.getrandbits(64) for _ in range(16))
+# maps: en passant target column -> key
+_ZOBRIST_EN_PASSANT = tuple(_zobrist_random.getrandbits(64) for _ in range(8))
+_ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+del _zobrist_random
+
 
 class GameState:  # pylint: disable=too-many-public-methods
     """Immutable state of a game.
@@ -49,6 +127,9 @@ class GameState:  # pylint: disable=too-many-public-methods
 
     Properties:
         id (int): The game state id.
+        zobrist (int): The zobrist hash of the board position (piece
+            placements, active color, castling rights, and en passant
+            target).
 
         white (Player): The white player.
         black (Player): The black player.
@@ -123,6 +204,35 @@ class GameState:  # pylint: disable=too-many-public-methods
             Returns the starting state with the same players.
     """
 
+    __slots__ = (
+        "_white",
+        "_black",
+        "_current_color",
+        "_moves",
+        "_promotions",
+        "_first_state",
+        "_prev",
+        "_half_move_clock",
+        "_num_moves",
+        "_seen_positions",
+        "_captured",
+        "_board",
+        "_squares",
+        "_kings",
+        "_promoting_pawn",
+        "_move",
+        "_castling_ability",
+        "_id",
+        "_placement_hash",
+        "_zobrist",
+        "_fen_ranks",
+        "_board_position",
+        "_fen",
+        "_is_in_check",
+        "_calculator_args",
+        "_end_game_state",
+    )
+
     __game_state_counter = count()
 
     def __init__(
@@ -141,8 +251,13 @@ class GameState:  # pylint: disable=too-many-public-methods
         num_moves: int,
         board: BoardDict,
         captured: Iterable[Piece],
+        placement_hash: Optional[int] = None,
     ):
-        """Initializes a GameState. Should only be called internally."""
+        """Initializes a GameState. Should only be called internally.
+
+        `placement_hash` is the zobrist hash of only the piece
+        placements, which is computed from `board` if not given.
+        """
         if key is not _PRIVATE_game_state_constructor_key:
             raise RuntimeError(
                 "You should not be calling the GameState constructor"
@@ -158,7 +273,12 @@ class GameState:  # pylint: disable=too-many-public-methods
 
         # cache the resulting game state whenever someone tries to make
         # a move, in case a bot wants to look ahead
-        self._moves: Dict[Move, GameState] = {}
+        # (states can't be shared between different parents, since they
+        # keep the game history; transpositions instead share the moves
+        # calculator, see `_cached_calculators`)
+        # (keyed by `Move.encode()`, which is cheaper to hash than the
+        # `Move` itself)
+        self._moves: Dict[int, GameState] = {}
         # cache the resulting game state whenever a pawn is promoted
         self._promotions: Dict[PromoteType, GameState] = {}
 
@@ -179,22 +299,32 @@ class GameState:  # pylint: disable=too-many-public-methods
         else:
             self._seen_positions = prev._seen_positions.copy()
 
-        self._captured = tuple(captured)
+        if isinstance(captured, tuple):
+            # tuples are immutable, so they can be shared between states
+            self._captured = captured
+        else:
+            self._captured = tuple(captured)
 
         # construct board
         self._board: BoardDict = {}
+        # maps: board index -> piece or None (same pieces as `_board`,
+        #   but a list lookup is cheaper than a dict lookup)
+        self._squares = [None] * 128
         self._kings = [None, None]
-        seen_piece_ids = set()
+        # check for duplicate ids all at once
+        piece_ids = [piece.id for piece in board.values()]
+        if len(set(piece_ids)) != len(piece_ids):
+            ((piece_id, _),) = Counter(piece_ids).most_common(1)
+            raise ValueError(f"Multiple pieces with id: {piece_id}")
         unmoved_rooks = ([None, None], [None, None])
         for piece in board.values():
-            if piece.id in seen_piece_ids:
-                raise ValueError(f"Multiple pieces with id: {piece.id}")
-            seen_piece_ids.add(piece.id)
-            if piece.pos in self._board:
+            index = board_index(*piece.pos)
+            if self._squares[index] is not None:
                 raise ValueError(f"Multiple pieces at position {piece.pos}")
-            self._board[piece.pos] = piece
+            self._board[index] = piece
+            self._squares[index] = piece
             if piece.type is PieceType.KING:
-                self._kings[piece.color.value] = piece
+                self._kings[piece.color.index] = piece
             elif piece.type is PieceType.ROOK:
                 if piece.is_at_start_pos():
                     index = None
@@ -204,7 +334,7 @@ class GameState:  # pylint: disable=too-many-public-methods
                     else:
                         # kingside rook
                         index = 0
-                    unmoved_rooks[piece.color.value][index] = piece
+                    unmoved_rooks[piece.color.index][index] = piece
 
         # validate last move
         piece_moved = None
@@ -213,11 +343,11 @@ class GameState:  # pylint: disable=too-many-public-methods
         if move is None:
             self._move = None
         else:
-            if self.get_piece(*move.pos) is not None:
+            if self._squares[board_index(*move.pos)] is not None:
                 raise ValueError(
                     "Invalid move from prev: start position still has a piece"
                 )
-            piece_moved = self.get_piece(*move.result_pos)
+            piece_moved = self._squares[board_index(*move.result_pos)]
             if piece_moved is None:
                 raise ValueError(
                     "Invalid move from prev: end position is empty"
@@ -241,7 +371,7 @@ class GameState:  # pylint: disable=too-many-public-methods
         # board, which is still invalid
         _, r0, c0 = self._kings[0].pos
         _, r1, c1 = self._kings[1].pos
-        if abs(r0 - r1) <= 1 and abs(c0 - c1) <= 1:
+        if _IS_ADJACENT[r0 - r1 + 7][c0 - c1 + 7]:
             raise ValueError("Kings are next to each other")
 
         # validate castling ability (rooks must exist)
@@ -249,7 +379,7 @@ class GameState:  # pylint: disable=too-many-public-methods
         for color in (Color.WHITE, Color.BLACK):
             color_can_castle = []
             for can_castle, rook in zip(
-                castling_ability[color.value], unmoved_rooks[color.value]
+                castling_ability[color.index], unmoved_rooks[color.index]
             ):
                 color_can_castle.append(can_castle and rook is not None)
             self._castling_ability.append(tuple(color_can_castle))
@@ -257,45 +387,69 @@ class GameState:  # pylint: disable=too-many-public-methods
 
         self._id = next(self.__game_state_counter)
 
+        # zobrist hash
+        if placement_hash is None:
+            placement_hash = 0
+            for index, piece in self._board.items():
+                placement_hash ^= _ZOBRIST_PIECES[piece.fen_name][index]
+        self._placement_hash = placement_hash
+        castling_bits = 0
+        for color_can_castle in self._castling_ability:
+            for can_castle in color_can_castle:
+                castling_bits = (castling_bits << 1) | can_castle
+        zobrist = placement_hash ^ _ZOBRIST_CASTLING[castling_bits]
+        if en_passant_pawn is not None:
+            zobrist ^= _ZOBRIST_EN_PASSANT[en_passant_pawn.pos.c]
+        if self._current_color is Color.BLACK:
+            zobrist ^= _ZOBRIST_BLACK_TO_MOVE
+        self._zobrist = zobrist
+
         # compute fen representation
         # forsyth-edwards notation (FEN): https://www.chess.com/terms/fen-chess
         fen = []
 
-        def color_case(color, value):
-            if color is Color.WHITE:
-                return value.upper()
-            else:  # color is Color.BLACK
-                return value.lower()
-
         # piece placements
-        placements = []
-        for bn in range(2):
-            for r in range(8):
-                rank = []
-                empty = 0
-                for c in range(8):
-                    piece = self.get_piece(bn, r, c)
-                    if piece is None:
-                        empty += 1
-                        continue
-                    if empty > 0:
-                        rank.append(str(empty))
-                        empty = 0
-                    rank.append(piece.fen_name)
-                if empty > 0:
-                    rank.append(str(empty))
-                placements.append("".join(rank))
-        fen.append("/".join(placements))
+        if prev is None:
+            # write every empty square as "1", then collapse the runs of
+            # empty squares (ranks are separated, so runs can't span
+            # them)
+            squares = "".join(
+                [
+                    "1" if piece is None else piece.fen_name
+                    for piece in self._squares
+                ]
+            )
+            placements = "/".join(
+                [
+                    squares[rank_start : rank_start + 8]
+                    for rank_start in range(0, 128, 8)
+                ]
+            )
+            for empty_run, num_empty in _EMPTY_RUNS:
+                placements = placements.replace(empty_run, num_empty)
+            self._fen_ranks = placements.split("/")
+        else:
+            # a move only changes the ranks of its start, capture, and
+            # result positions (en passant captures and castling rooks
+            # stay on those ranks), so the rest are reused from prev
+            self._fen_ranks = prev._fen_ranks.copy()
+            for pos in (move.pos, move.capture_pos, move.result_pos):
+                rank_i = pos.bn * 8 + pos.r
+                self._fen_ranks[rank_i] = _fen_rank(
+                    self._squares[rank_i * 8 : rank_i * 8 + 8]
+                )
+            placements = "/".join(self._fen_ranks)
+        fen.append(placements)
         # active color
-        fen.append(self._current_color.abbr().lower())
+        fen.append(self._current_color.abbr_lower)
         # castling rights
         castling = []
-        for color in (Color.WHITE, Color.BLACK):
-            for can_castle, letter in zip(
-                self._castling_ability[color.value], "KQ"
-            ):
+        for color_can_castle, letters in zip(
+            self._castling_ability, ("KQ", "kq")
+        ):
+            for can_castle, letter in zip(color_can_castle, letters):
                 if can_castle:
-                    castling.append(color_case(color, letter))
+                    castling.append(letter)
         if len(castling) == 0:
             fen.append("-")
         else:
@@ -310,14 +464,15 @@ class GameState:  # pylint: disable=too-many-public-methods
         # seen position (basically fen without the move counters)
         board_position = tuple(fen)
         self._seen_positions[board_position] += 1
-        # half move clock
-        fen.append(str(self._half_move_clock))
-        # full move number
-        fen.append(str(self._num_moves))
-        # combine
-        self._fen = " ".join(fen)
+        self._board_position = board_position
+        # the full fen (with the move counters) is only combined when
+        # it's asked for
+        self._fen = None
 
         self._is_in_check = False
+        # the possible moves are only calculated once they're needed
+        # (see `_calculate_moves()`)
+        self._calculator_args = None
         # some draws could technically happen at the same time, so this
         # order is arbitrary
         if len(self._board) == 2:
@@ -335,8 +490,23 @@ class GameState:  # pylint: disable=too-many-public-methods
             self._end_game_state = EndGameState.THREEFOLD_REPETITION_DRAW
             return
 
+        self._end_game_state = None
         # combine piece positions, castling rights, en passant target
         board_state = (fen[0], fen[2], fen[3])
+        self._calculator_args = (board_state, unmoved_rooks, en_passant_pawn)
+        if prev is None:
+            # calculate right away so that an invalid starting position
+            # is caught here
+            self._calculate_moves()
+
+    def _calculate_moves(self):
+        """Calculates the possible moves of the pieces and the end game
+        state, if they haven't been calculated yet.
+        """
+        if self._calculator_args is None:
+            return
+        board_state, unmoved_rooks, en_passant_pawn = self._calculator_args
+
         if board_state in _cached_calculators:
             # with the given board state (and castling rights and en
             # passant target), the pieces should have the same moves
@@ -352,6 +522,7 @@ class GameState:  # pylint: disable=too-many-public-methods
             )
             _cached_calculators[board_state] = calculator
         calculator.assign_moves_to_pieces(self._board)
+        self._calculator_args = None
 
         self._is_in_check = calculator.is_in_check(self._current_color)
 
@@ -362,8 +533,6 @@ class GameState:  # pylint: disable=too-many-public-methods
                 self._end_game_state = EndGameState.CHECKMATE
             else:
                 self._end_game_state = EndGameState.STALEMATE
-        else:
-            self._end_game_state = None
 
     @classmethod
     def new(cls, *, white: Type[AnyPlayer], black: Type[AnyPlayer]) -> Self:
@@ -416,32 +585,24 @@ class GameState:  # pylint: disable=too-many-public-methods
                 "`fen` piece placements expects 16 ranks; "
                 f"got {len(placements)}"
             )
-        PIECE_CLASSES: Dict[str, Type[Piece]] = {
-            "K": pieces.King,
-            "Q": pieces.Queen,
-            "R": pieces.Rook,
-            "N": pieces.Knight,
-            "B": pieces.Bishop,
-            "P": pieces.Pawn,
-        }
         piece_id = count()
         board: BoardDict = {}
         for i, rank in enumerate(placements):
             bn, r = divmod(i, 8)
-            num_files = 0
-            for c in rank:
-                # allow multiple consecutive digits in a rank, just
-                # because i'm not gonna be super strict about this
-                if c.isdigit():
-                    num_files += int(c)
+            # expand the empty squares so that each character is a file
+            # (this allows multiple consecutive digits in a rank, just
+            # because i'm not gonna be super strict about this)
+            files = rank.translate(_EXPAND_EMPTY)
+            for file, c in enumerate(files):
+                if c == ".":
                     continue
-                piece_cls = PIECE_CLASSES.get(c.upper(), None)
-                if piece_cls is None:
+                piece_cls_and_color = _PIECE_SYMBOLS.get(c, None)
+                if piece_cls_and_color is None:
                     raise ValueError(f"Rank {i}: invalid piece symbol: {c!r}")
-                color = color_from_case(c)
-                piece = piece_cls(next(piece_id), color, (bn, r, num_files))
-                board[piece.pos] = piece
-                num_files += 1
+                piece_cls, color = piece_cls_and_color
+                piece = piece_cls(next(piece_id), color, (bn, r, file))
+                board[board_index(*piece.pos)] = piece
+            num_files = len(files)
             if num_files < 8:
                 raise ValueError(f"Rank {i} has less than 8 files: {rank}")
             elif num_files > 8:
@@ -471,7 +632,7 @@ class GameState:  # pylint: disable=too-many-public-methods
                 else:
                     raise ValueError(f"Invalid castling symbol: {c!r}")
                 color = color_from_case(c)
-                castling_ability[color.value][index] = True
+                castling_ability[color.index][index] = True
 
         # get en passant pawn
         if en_passant_target == "-":
@@ -486,9 +647,9 @@ class GameState:  # pylint: disable=too-many-public-methods
             r, c = en_passant_pos
             # check for a pawn that is right in front of this position
             if r == 2:
-                pawn = board.get((1, r + 1, c), None)
+                pawn = board.get(board_index(1, r + 1, c), None)
             elif r == 5:
-                pawn = board.get((1, r - 1, c), None)
+                pawn = board.get(board_index(1, r - 1, c), None)
             else:
                 raise ValueError(
                     "Invalid en passant target: rank must be 3 (for black) or "
@@ -505,15 +666,13 @@ class GameState:  # pylint: disable=too-many-public-methods
                 )
             # check that the pawn could have made this move in the last
             # turn
-            if any(
-                pos in board
-                for pos in (
-                    # something was blocking on the original board
-                    (0, r, c),
-                    # something else is in the original position
-                    (0, r - pawn.dr, c),
-                    (1, r - pawn.dr, c),
-                )
+            start_r = r - pawn.dr
+            if (
+                # something was blocking on the original board
+                board_index(0, r, c) in board
+                # something else is in the original position
+                or board_index(0, start_r, c) in board
+                or board_index(1, start_r, c) in board
             ):
                 raise ValueError(
                     f"En passant pawn at {pawn.pos} could not have advanced "
@@ -551,13 +710,20 @@ class GameState:  # pylint: disable=too-many-public-methods
         )
 
     def __str__(self) -> str:
-        return self._fen
+        return self.fen()
 
     @property
     def id(self) -> int:
         """The game state id."""
         return self._id
 
+    @property
+    def zobrist(self) -> int:
+        """The zobrist hash of the board position (piece placements,
+        active color, castling rights, and en passant target).
+        """
+        return self._zobrist
+
     @property
     def white(self) -> AnyPlayer:
         """The white player."""
@@ -578,11 +744,14 @@ class GameState:  # pylint: disable=too-many-public-methods
         """The move from the previous GameState, or None if this is the
         first state.
         """
+        # the moved piece is on this board, so make sure it has its moves
+        self._calculate_moves()
         return self._move
 
     @property
     def end_game_state(self) -> Optional[EndGameState]:
         """The end game state."""
+        self._calculate_moves()
         return self._end_game_state
 
     @property
@@ -617,6 +786,12 @@ class GameState:  # pylint: disable=too-many-public-methods
         doubled in length, where the first 8 ranks refer to Board A (on
         the left) and the last 8 ranks refer to Board B (on the right).
         """
+        if self._fen is None:
+            # add the half move clock and the full move number
+            self._fen = (
+                f"{' '.join(self._board_position)} "
+                f"{self._half_move_clock} {self._num_moves}"
+            )
         return self._fen
 
     def board_to_str(self, empty: str = ".") -> str:
@@ -634,20 +809,22 @@ class GameState:  # pylint: disable=too-many-public-methods
         """
         if len(empty) != 1:
             raise ValueError("`empty` must have length 1")
-        board_str = []
-        for r in range(8):
-            line = []
-            for bn in range(2):
-                for c in range(8):
-                    pos = (bn, r, c)
-                    if pos not in self._board:
-                        line.append(empty)
-                    else:
-                        piece = self._board[pos]
-                        line.append(piece.fen_name)
-                line.append(" ")
-            board_str.append(" ".join(line))
-        return "\n".join(board_str)
+        squares = [
+            empty if piece is None else piece.fen_name
+            for piece in self._squares
+        ]
+        # each line has the rank from board A, then the rank from board B
+        return "\n".join(
+            " ".join(
+                (
+                    *squares[a_start : a_start + 8],
+                    " ",
+                    *squares[a_start + 64 : a_start + 72],
+                    " ",
+                )
+            )
+            for a_start in range(0, 64, 8)
+        )
 
     def moves_to_str(
         self, columns: int = 4, captured_empty: bool = True
@@ -686,7 +863,6 @@ class GameState:  # pylint: disable=too-many-public-methods
                 (piece.id, piece) for piece in self.yield_all_pieces()
             )
         num_rows = math.ceil(len(all_pieces) / columns)
-        col_widths = [0] * columns
         col_has_piece = [False] * columns
         cols = [[] for _ in range(columns)]
         col_i = 0
@@ -705,18 +881,16 @@ class GameState:  # pylint: disable=too-many-public-methods
                 col_has_piece[col_i] = True
             col = cols[col_i]
             col.append(line)
-            col_widths[col_i] = max(len(line), col_widths[col_i])
             if len(col) >= num_rows:
                 # start filling up the next column
                 col_i += 1
+        # left-align each included column to its widest line
+        row_format = (" " * COL_PADDING).join(
+            f"{{:<{max(map(len, col))}}}"
+            for col in compress(cols, col_has_piece)
+        )
         return "\n".join(
-            (" " * COL_PADDING).join(
-                value.ljust(width)
-                for value, include_col, width in zip(
-                    row, col_has_piece, col_widths
-                )
-                if include_col
-            )
+            row_format.format(*compress(row, col_has_piece))
             # use zip longest because the last column may be shorter
             for row in zip_longest(*cols, fillvalue="")
         )
@@ -756,10 +930,12 @@ class GameState:  # pylint: disable=too-many-public-methods
         """Returns whether the game is over (checkmate, stalemate, or
         draw).
         """
+        self._calculate_moves()
         return self._end_game_state is not None
 
     def is_in_checkmate(self) -> bool:
         """Returns whether the current player is in checkmate."""
+        self._calculate_moves()
         return self._end_game_state is EndGameState.CHECKMATE
 
     def winner(self) -> Optional[Color]:
@@ -768,20 +944,23 @@ class GameState:  # pylint: disable=too-many-public-methods
             return None
         # the winner is the other color, since the current color is in
         # checkmate
-        return self._current_color.other()
+        return self._current_color.other_color
 
     def is_in_stalemate(self) -> bool:
         """Returns whether the current player is in stalemate."""
+        self._calculate_moves()
         return self._end_game_state is EndGameState.STALEMATE
 
     def is_draw(self) -> bool:
         """Returns whether the game is a draw."""
+        self._calculate_moves()
         return (
             self._end_game_state is not None and self._end_game_state.is_draw()
         )
 
     def is_in_check(self) -> bool:
         """Returns whether the current player is in check."""
+        self._calculate_moves()
         return self._is_in_check
 
     def needs_promotion(self) -> bool:
@@ -814,11 +993,24 @@ class GameState:  # pylint: disable=too-many-public-methods
         pawn = self._promoting_pawn
 
         # create copy of board
-        board = {pos: piece.copy() for pos, piece in self._board.items()}
+        # (the pieces can't be shared with this state, since each state
+        # assigns its own possible moves to its pieces, and the sibling
+        # promotions would overwrite each other's moves)
+        pawn_index = board_index(*pawn.pos)
+        board = {
+            index: piece.copy()
+            for index, piece in self._board.items()
+            if index != pawn_index
+        }
 
         # replace this pawn with the specified piece type
         promoted_piece = make_promoted(pawn, promote_type)
-        board[pawn.pos] = promoted_piece
+        board[pawn_index] = promoted_piece
+        placement_hash = (
+            self._placement_hash
+            ^ _ZOBRIST_PIECES[pawn.fen_name][pawn_index]
+            ^ _ZOBRIST_PIECES[promoted_piece.fen_name][pawn_index]
+        )
 
         # create new game state
         new_state = self.__class__(
@@ -828,8 +1020,9 @@ class GameState:  # pylint: disable=too-many-public-methods
             current_color=self._current_color,
             # direct back to this state's previous state
             prev=self._prev,
-            # use the same move from previous
-            move=(self._move.pos, self._move.target),
+            # use the same move from previous (already a `Move`, so it
+            # doesn't need to be converted again)
+            move=self._move,
             piece_captured=self._move.piece_captured,
             castling_ability=self._castling_ability,
             # this pawn was promoting, so there is no en passant pawn
@@ -838,6 +1031,7 @@ class GameState:  # pylint: disable=too-many-public-methods
             num_moves=self._num_moves,
             board=board,
             captured=self._captured,
+            placement_hash=placement_hash,
         )
         # cache the promotion state
         self._promotions[promote_type] = new_state
@@ -845,6 +1039,7 @@ class GameState:  # pylint: disable=too-many-public-methods
 
     def yield_all_pieces(self) -> Iterator[Piece]:
         """Yields all the pieces."""
+        self._calculate_moves()
         return iter(self._board.values())
 
     def yield_player_pieces(self) -> Iterator[Piece]:
@@ -883,7 +1078,9 @@ class GameState:  # pylint: disable=too-many-public-methods
         Returns:
             Optional[Piece]: The piece, or None.
         """
-        return self._board.get((bn, r, c), None)
+        check_brc(bn, r, c)
+        self._calculate_moves()
+        return self._squares[board_index(bn, r, c)]
 
     def make_move(self, move: Move) -> Self:
         """Makes the given move.
@@ -892,6 +1089,11 @@ class GameState:  # pylint: disable=too-many-public-methods
         be moved without being promoted. It is up to the caller to call
         the `GameState.promote()` method on the returned state.
 
+        The possible moves of the returned state are only calculated
+        once they are needed (such as by `is_game_over()` or when
+        getting its pieces), so making a move that is then discarded is
+        cheap.
+
         Args:
             move (Move): The move to make.
 
@@ -906,46 +1108,69 @@ class GameState:  # pylint: disable=too-many-public-methods
         """
         move = Move.of(move)
         (bn, r, c), (tr, tc) = move
-        curr_color = self._current_color.value
+        current_color = self._current_color
 
         if self.is_game_over():
             raise RuntimeError("Game is over")
         if self.needs_promotion():
             raise RuntimeError("Game needs a promotion")
 
-        if move in self._moves:
-            return self._moves[move]
+        move_key = move.encode()
+        next_state = self._moves.get(move_key, None)
+        if next_state is not None:
+            return next_state
+
+        src_index = board_index(bn, r, c)
+        capture_index = board_index(bn, tr, tc)
+        result_index = board_index(1 - bn, tr, tc)
 
-        piece = self.get_piece(*move.pos)
+        # the move's positions are already validated and the moves are
+        # already calculated (by `is_game_over()`), so index the squares
+        # directly instead of going through `get_piece()`
+        piece = self._squares[src_index]
         if piece is None:
             raise ValueError(f"No piece at position {move.pos}")
-        if piece.color is not self._current_color:
+        if piece.color is not current_color:
             raise ValueError("Cannot move opponent's piece")
-        if not piece.can_make_move(*move.capture_pos):
+        if not piece.can_make_move(bn, tr, tc):
             raise ValueError(
                 f"Piece at {move.pos} cannot move to {move.target}"
             )
+        piece_type = piece.type
 
         # check just in case
-        other_board = self.get_piece(*move.result_pos)
-        if other_board is not None:
+        if self._squares[result_index] is not None:
             raise ValueError("Move squashes a piece on the other board")
 
-        # make new copy of board
-        board = {pos: piece.copy() for pos, piece in self._board.items()}
-        captured = list(self._captured)
+        # the pieces that leave their squares are taken out of a shallow
+        # copy of the board, and only the untouched pieces are copied at
+        # the end (the moved pieces are already new objects)
+        board = dict(self._board)
+        # maps: board index -> moved piece
+        moved_pieces = {}
+        # shared with this state, and only copied if a piece is captured
+        # (which happens at most 30 times in a game, so a linked list of
+        # captures wouldn't save anything over copying the tuple)
+        captured = self._captured
 
         # make the copy of the castling ability mutable
         castling_ability = list(map(list, self._castling_ability))
         half_move_clock = self._half_move_clock + 1
 
         # make move
-        moved_piece = board.pop(piece.pos).move_to(move.result_pos)
-        board[move.result_pos] = moved_piece
+        moved_piece = board.pop(src_index).move_to(move.result_pos)
+        moved_pieces[result_index] = moved_piece
+        # update the zobrist hash of the placements as pieces move
+        piece_keys = _ZOBRIST_PIECES[piece.fen_name]
+        placement_hash = (
+            self._placement_hash
+            ^ piece_keys[src_index]
+            ^ piece_keys[result_index]
+        )
 
-        piece_captured = board.pop(move.capture_pos, None)
+        piece_captured = board.pop(capture_index, None)
         # check for en passant
-        if piece.type is PieceType.PAWN:
+        if piece_type is PieceType.PAWN:
             # reset clock: pawn moved
             half_move_clock = 0
             if c == tc:
@@ -956,7 +1181,8 @@ class GameState:  # pylint: disable=too-many-public-methods
                 pass
             else:
                 # change capture to en passant (same row)
-                piece_captured = board.pop((bn, r, tc), None)
+                capture_index = board_index(bn, r, tc)
+                piece_captured = board.pop(capture_index, None)
                 if piece_captured is None:
                     raise ValueError(
                         "Pawn performed en passant, but no piece to capture"
@@ -967,32 +1193,35 @@ class GameState:  # pylint: disable=too-many-public-methods
         if piece_captured is not None:
             # reset clock: piece was captured
             half_move_clock = 0
+            placement_hash ^= _ZOBRIST_PIECES[piece_captured.fen_name][
+                capture_index
+            ]
             piece_captured = piece_captured.capture()
-            captured.append(piece_captured)
+            captured += (piece_captured,)
 
         # check for castle
-        if piece.type is PieceType.KING:
+        if piece_type is PieceType.KING:
             # king moved, so this color can no longer castle
-            castling_ability[curr_color] = (False, False)
-            if piece.is_at_start_pos() and abs(c - tc) == 2:
+            castling_ability[current_color.index] = (False, False)
+            if piece.is_at_start_pos() and tc in _CASTLE_ROOK_COLUMNS:
                 # king is castling
-                if tc < c:
-                    # queenside castle
-                    rook_old_c = 0
-                    rook_new_c = c - 1
-                else:  # tc > c
-                    # kingside castle
-                    rook_old_c = 7
-                    rook_new_c = c + 1
+                rook_old_c, rook_new_c = _CASTLE_ROOK_COLUMNS[tc]
                 # move rook to new board between old and new positions
                 # of king
                 rook_old_pos = (bn, tr, rook_old_c)
                 rook_new_pos = (1 - bn, tr, rook_new_c)
-                rook = board.pop(rook_old_pos, None)
+                rook = board.pop(board_index(*rook_old_pos), None)
                 if rook is None:
                     raise ValueError("King castling with non-existent rook")
-                board[rook_new_pos] = rook.move_to(rook_new_pos)
-        if piece.type is PieceType.ROOK:
+                rook_keys = _ZOBRIST_PIECES[rook.fen_name]
+                placement_hash ^= (
+                    rook_keys[board_index(*rook_old_pos)]
+                    ^ rook_keys[board_index(*rook_new_pos)]
+                )
+                moved_pieces[board_index(*rook_new_pos)] = rook.move_to(
+                    rook_new_pos
+                )
+        if piece_type is PieceType.ROOK:
             # rook moved, so this color can no longer castle on this
             # side
             if piece.is_at_start_pos():
@@ -1004,17 +1233,24 @@ class GameState:  # pylint: disable=too-many-public-methods
                     # kingside rook moved
                     index = 0
                 if index is not None:
-                    castling_ability[curr_color][index] = False
+                    castling_ability[current_color.index][index] = False
 
         # check for en passant
         en_passant_pawn = None
-        if piece.type is PieceType.PAWN and piece.is_at_start_pos():
+        if piece_type is PieceType.PAWN and piece.is_at_start_pos():
             if bn == 0 and abs(r - tr) == 2 and c == tc:
                 # pawn advanced two steps
                 en_passant_pawn = moved_piece
 
+        # make new copy of board
+        # (this can't share structure with this state's board, like a
+        # persistent map would: every piece has to be copied anyway,
+        # since each state assigns its own possible moves to its pieces)
+        board = {index: piece.copy() for index, piece in board.items()}
+        board.update(moved_pieces)
+
         num_moves = self._num_moves
-        if self._current_color is Color.BLACK:
+        if current_color is Color.BLACK:
             # increments when black plays
             num_moves += 1
 
@@ -1023,7 +1259,7 @@ class GameState:  # pylint: disable=too-many-public-methods
             _PRIVATE_game_state_constructor_key,
             white=self._white,
             black=self._black,
-            current_color=self._current_color.other(),
+            current_color=current_color.other_color,
             prev=self,
             move=move,
             piece_captured=piece_captured,
@@ -1033,8 +1269,9 @@ class GameState:  # pylint: disable=too-many-public-methods
             num_moves=num_moves,
             board=board,
             captured=captured,
+            placement_hash=placement_hash,
         )
-        self._moves[move] = next_state
+        self._moves[move_key] = next_state
         return next_state
 
     def step(self) -> Self:
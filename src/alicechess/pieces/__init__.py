@@ -9,8 +9,7 @@ import typing as _t
 from alicechess.pieces.king import King
 from alicechess.pieces.pawn import Pawn
 from alicechess.pieces.piece import Piece
-from alicechess.position import BoardPosition
-from alicechess.utils import Color, PieceType, PromoteType
+from alicechess.utils import PieceType, PromoteType
 
 # =============================================================================
 
@@ -28,34 +27,37 @@ __all__ = (
 # =============================================================================
 
 
+class _SimplePiece(Piece):
+    """A piece that only differs from the others by its type and start
+    positions.
+    """
+
+    # the start rows, indexed by the color index (set by every subclass)
+    _start_rows: _t.Tuple[int, int]
+    # the start columns, or None if any column is allowed
+    _start_columns: _t.Optional[_t.Tuple[int, ...]] = None
+
+    def _check_start_position(self, bn: int, r: int, c: int) -> bool:
+        return (
+            bn == 0
+            and r == self._start_rows[self._color.index]
+            and (self._start_columns is None or c in self._start_columns)
+        )
+
+
 def _make_simple_piece(piece_type, rows, columns=None) -> _t.Type[Piece]:
     """Makes a piece."""
-    # pylint: disable=missing-class-docstring
-
-    class Subclass(Piece):
-        _type = piece_type
-
-        def is_at_start_pos(
-            self, pos: _t.Optional[BoardPosition] = None
-        ) -> bool:
-            bn, r, c = pos or self._pos
-            if bn != 0:
-                return False
-            if self._color is Color.WHITE:
-                row = rows[0]
-            else:
-                row = rows[1]
-            if r != row:
-                return False
-            if columns is not None and c not in columns:
-                return False
-            return True
-
     piece_name = piece_type.title()
-    Subclass.__name__ = piece_name
-    Subclass.__doc__ = f"{piece_name} piece."
-
-    return Subclass
+    return type(
+        piece_name,
+        (_SimplePiece,),
+        {
+            "__doc__": f"{piece_name} piece.",
+            "_type": piece_type,
+            "_start_rows": rows,
+            "_start_columns": columns,
+        },
+    )
 
 
 # queen is always on the left for this particular board setup
@@ -66,14 +68,16 @@ Bishop = _make_simple_piece(PieceType.BISHOP, (7, 0), (2, 5))
 
 # =============================================================================
 
+# maps: promote type -> piece class
+_PROMOTE_CLASSES: _t.Dict[PromoteType, _t.Type[Piece]] = {
+    PromoteType.QUEEN: Queen,
+    PromoteType.ROOK: Rook,
+    PromoteType.KNIGHT: Knight,
+    PromoteType.BISHOP: Bishop,
+}
+
 
 def make_promoted(
     pawn: Pawn, promote_type: PromoteType
 ) -> _t.Union[Queen, Rook, Knight, Bishop]:
-    PROMOTE_CLASSES = {
-        PromoteType.QUEEN: Queen,
-        PromoteType.ROOK: Rook,
-        PromoteType.KNIGHT: Knight,
-        PromoteType.BISHOP: Bishop,
-    }
-    return PROMOTE_CLASSES[promote_type](pawn.id, pawn.color, pawn.pos)
+    return _PROMOTE_CLASSES[promote_type](pawn.id, pawn.color, pawn.pos)
@@ -4,10 +4,9 @@ King piece.
 
 # =============================================================================
 
-from typing import Optional
+from typing import Tuple
 
 from alicechess.pieces.piece import Piece
-from alicechess.position import BoardPosition
 from alicechess.utils import Color, PieceType
 
 # =============================================================================
@@ -22,17 +21,14 @@ class King(Piece):
         super().__init__(*args, **kwargs)
 
         if self._color is Color.WHITE:
-            start_row = 7
+            self._start_row = 7
         else:
-            start_row = 0
-        # king is always on the right (for this particular board setup)
-        self._start_pos = (0, start_row, 4)
+            self._start_row = 0
 
-    def is_at_start_pos(self, pos: Optional[BoardPosition] = None) -> bool:
-        return (pos or self._pos) == self._start_pos
+    def _check_start_position(self, bn: int, r: int, c: int) -> bool:
+        # king is always on the right (for this particular board setup)
+        return bn == 0 and r == self._start_row and c == 4
 
-    def _add_castle(self, c: int):
-        """Adds a castle to the given column."""
-        if self._moves is None:
-            raise RuntimeError("King has not calculated its possible moves")
-        self._add_move(self._pos.r, c)
+    def _castle_target(self, c: int) -> Tuple[int, int]:
+        """Returns the target of a castle to the given column."""
+        return (self._pos.r, c)
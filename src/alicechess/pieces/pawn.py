@@ -4,10 +4,9 @@ Pawn piece.
 
 # =============================================================================
 
-from typing import Optional
+from typing import Tuple
 
 from alicechess.pieces.piece import Piece
-from alicechess.position import BoardPosition
 from alicechess.utils import Color, PieceType
 
 # =============================================================================
@@ -37,9 +36,12 @@ class Pawn(Piece):
             self._dr = 1
             self._start_row = 1
             self._promote_row = 7
+        # pieces never move (moving makes a copy), so this can't change
+        self._can_promote = (
+            self._pos is not None and self._pos.r == self._promote_row
+        )
 
-    def is_at_start_pos(self, pos: Optional[BoardPosition] = None) -> bool:
-        bn, r, c = pos or self._pos
+    def _check_start_position(self, bn: int, r: int, c: int) -> bool:
         return bn == 0 and r == self._start_row
 
     @property
@@ -50,8 +52,10 @@ class Pawn(Piece):
     @property
     def can_promote(self) -> bool:
         """Whether the pawn can be promoted."""
-        return self._pos.r == self._promote_row
+        return self._can_promote
 
-    def _add_en_passant(self, c: int):
-        """Adds an en passant move into the given column."""
-        self._add_move(self._pos.r + self._dr, c)
+    def _en_passant_target(self, c: int) -> Tuple[int, int]:
+        """Returns the target of an en passant move into the given
+        column.
+        """
+        return (self._pos.r + self._dr, c)
@@ -4,7 +4,7 @@ Piece abstract class.
 
 # =============================================================================
 
-from typing import Iterator, Optional, Set
+from typing import Dict, Iterable, Optional, Set, Tuple, Type
 
 from alicechess.position import BoardPosition, PieceMove, Position
 from alicechess.utils import Color, PieceType, check_brc
@@ -15,6 +15,12 @@ __all__ = ("Piece",)
 
 # =============================================================================
 
+# maps: (piece class, piece id, color) -> captured piece
+# (captured pieces have no position or moves, so they can be shared)
+_captured_pieces: Dict[Tuple[Type["Piece"], int, Color], "Piece"] = {}
+
+# =============================================================================
+
 
 class Piece:
     """Represents a piece.
@@ -39,7 +45,7 @@ class Piece:
         copy() -> Piece
             Returns a copy of this piece.
 
-        yield_moves() -> Iterator[PieceMove]
+        yield_moves() -> Iterable[PieceMove]
             Yields the possible moves for this piece.
         can_make_move(bn, tr, tc) -> bool
             Returns whether this piece can move to the given position.
@@ -52,6 +58,21 @@ class Piece:
     """
 
     _type: PieceType = None
+    # set for each subclass from its `_type` (see `__init_subclass__()`)
+    _title: str = None
+    # maps: color value -> (name, FEN name)
+    _names: Tuple[Tuple[str, str], ...] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls._type is None:
+            return
+        cls._title = cls._type.title()
+        symbol = cls._type.value
+        cls._names = (
+            (Color.WHITE.abbr() + symbol, symbol),
+            (Color.BLACK.abbr() + symbol, symbol.lower()),
+        )
 
     def __init__(
         self,
@@ -71,16 +92,18 @@ class Piece:
 
         self._id = piece_id
         self._color = color
-        self._name = color.abbr() + self._type.value
-        self._fen_name = self._type.value
-        if self._color is Color.BLACK:
-            self._fen_name = self._fen_name.lower()
+        self._name, self._fen_name = self._names[color.index]
 
         self._pos = BoardPosition.of(pos)
         self._is_captured = captured
         self._is_threatened = False
+        # whether this piece is at a start position (see
+        # `is_at_start_pos()`), or None if not known yet
+        self._at_start_pos = None
 
         self._moves = None
+        # the targets of `_moves`, for fast membership checks
+        self._targets = None
 
     def __str__(self):
         attrs = {
@@ -91,7 +114,7 @@ class Piece:
         if self._is_captured:
             attrs["captured"] = True
         attrs_str = " ".join(f"{key}={val}" for key, val in attrs.items())
-        return f"{self._type.title()}<{attrs_str}>"
+        return f"{self._title}<{attrs_str}>"
 
     def __repr__(self):
         args = {
@@ -169,6 +192,17 @@ class Piece:
         return self._is_threatened
 
     def is_at_start_pos(self, pos: Optional[BoardPosition] = None) -> bool:
+        """Returns whether the given position could be a start position
+        of the piece.
+        """
+        if pos is not None:
+            return self._check_start_position(*pos)
+        # pieces never move (moving makes a copy), so this can't change
+        if self._at_start_pos is None:
+            self._at_start_pos = self._check_start_position(*self._pos)
+        return self._at_start_pos
+
+    def _check_start_position(self, bn: int, r: int, c: int) -> bool:
         """Returns whether the given position could be a start position
         of the piece.
         """
@@ -176,33 +210,37 @@ class Piece:
 
     def copy(self) -> "Piece":
         """Returns a copy of this piece."""
-        return self.__class__(
-            self._id,
-            self._color,
-            self._pos,
-            self._is_captured,
-        )
-
-    def _set_possible_moves(self, moves: Set[Position]):
-        """Sets the possible moves of this piece. Should only be called
-        by a `MovesCalculator` instance.
+        # everything except the calculated state only depends on the
+        # constructor args, so copy the attributes directly instead of
+        # re-running (and re-validating) `__init__()`
+        piece = object.__new__(self.__class__)
+        piece.__dict__.update(self.__dict__)
+        piece._is_threatened = False
+        piece._moves = None
+        piece._targets = None
+        return piece
+
+    def _set_possible_moves(
+        self,
+        moves: Set[Position],
+        special_targets: Tuple[Tuple[int, int], ...] = (),
+    ):
+        """Sets the possible moves of this piece, including any special
+        moves (castles or en passants). Should only be called by a
+        `MovesCalculator` instance.
         """
         if self._is_captured:
             raise RuntimeError("Cannot set possible moves for captured piece")
-        self._moves = []
-        for target in moves:
-            self._moves.append(PieceMove(self._pos, target, self))
-        self._moves.sort()
-
-    def _add_move(self, tr: int, tc: int):
-        """Adds the given move."""
-        if self._moves is None:
-            raise ValueError(
-                f"{self._type.title()} has not calculated its possible moves"
-            )
-        check_brc(tr=tr, tc=tc)
-        self._moves.append(PieceMove(self._pos, (tr, tc), self))
-        self._moves.sort()
+        for tr, tc in special_targets:
+            check_brc(tr=tr, tc=tc)
+        # the moves all start from this position, so sorting the targets
+        # sorts the moves (the special moves are sorted in with the rest,
+        # so they never need to be inserted into the sorted moves later)
+        targets = sorted((*moves, *special_targets))
+        self._moves = tuple(
+            PieceMove(self._pos, target, self) for target in targets
+        )
+        self._targets = frozenset(targets)
 
     def _mark_threatened(self, is_threatened: bool):
         """Marks the current piece as being threatened or not. Should
@@ -217,13 +255,17 @@ class Piece:
             raise RuntimeError("Cannot get moves for captured piece")
         if self._moves is None:
             raise RuntimeError(
-                f"{self._type.title()} has not calculated its possible moves"
+                f"{self._title} has not calculated its possible moves"
             )
         return self._moves
 
-    def yield_moves(self) -> Iterator[PieceMove]:
-        """Yields the possible moves for this piece."""
-        return iter(self._get_moves())
+    def yield_moves(self) -> Iterable[PieceMove]:
+        """Yields the possible moves for this piece.
+
+        The moves are already stored as an immutable tuple, so it is
+        returned directly instead of wrapping it in an iterator.
+        """
+        return self._get_moves()
 
     def can_make_move(self, bn: int, tr: int, tc: int) -> bool:
         """Returns whether this piece can move to the given position.
@@ -245,7 +287,10 @@ class Piece:
         if bn != self._pos.bn:
             # can't move to somewhere on the other board
             return False
-        return (tr, tc) in (move.target for move in self._get_moves())
+        if self._targets is None:
+            # raise the proper error
+            self._get_moves()
+        return (tr, tc) in self._targets
 
     def move_to(self, pos: BoardPosition) -> "Piece":
         """Returns a copy of this piece that is moved to the given
@@ -260,4 +305,9 @@ class Piece:
         """Returns a copy of this piece that is captured."""
         if self._is_captured:
             return self
-        return self.__class__(self._id, self._color, captured=True)
+        key = (self.__class__, self._id, self._color)
+        piece = _captured_pieces.get(key, None)
+        if piece is None:
+            piece = self.__class__(self._id, self._color, captured=True)
+            _captured_pieces[key] = piece
+        return piece
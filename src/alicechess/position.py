@@ -4,7 +4,6 @@ Position, BoardPosition, Move, PieceMove, and PieceMoved classes.
 
 # =============================================================================
 
-from functools import total_ordering
 from typing import Iterable, Optional, Self, Tuple
 
 from alicechess.utils import check_brc
@@ -22,26 +21,37 @@ __all__ = (
 # =============================================================================
 
 
+# maps: r * 8 + c -> position code
+_RC_CODES = tuple(f"{file}{8 - r}" for r in range(8) for file in "abcdefgh")
+# maps: bn * 64 + r * 8 + c -> board position code
+_BRC_CODES = tuple(board + code for board in "AB" for code in _RC_CODES)
+
+# maps: file letter (either case) -> column
+_FILE_COLUMNS = {
+    **{file: c for c, file in enumerate("abcdefgh")},
+    **{file: c for c, file in enumerate("ABCDEFGH")},
+}
+# maps: rank digit -> row
+_RANK_ROWS = {str(8 - r): r for r in range(8)}
+
+
 def _rc_code(r: int, c: int) -> str:
-    rank = str(8 - r)
-    file = "abcdefgh"[c]
-    return f"{file}{rank}"
+    return _RC_CODES[r * 8 + c]
 
 
 def _rc_from_code(code: str) -> Tuple[int, int]:
     if len(code) != 2:
         raise ValueError("`code` must be length 2")
-    file, rank = code.lower()
-    if not rank.isdigit():
+    file, rank = code
+    r = _RANK_ROWS.get(rank, None)
+    if r is None and not rank.isdigit():
         raise ValueError(f"Invalid code: rank must be a digit (got {rank!r})")
-    try:
-        c = "abcdefgh".index(file)
-    except ValueError:
+    c = _FILE_COLUMNS.get(file, None)
+    if c is None:
         raise ValueError(
-            f"Invalid code: file must be a-h (got {file!r})"
-        ) from None
-    r = 8 - int(rank)
-    if not 0 <= r < 8:
+            f"Invalid code: file must be a-h (got {file.lower()!r})"
+        )
+    if r is None:
         raise ValueError(
             f"Invalid code: rank must be within [1, 8] (got {rank})"
         )
@@ -51,7 +61,6 @@ def _rc_from_code(code: str) -> Tuple[int, int]:
 # =============================================================================
 
 
-@total_ordering
 class _ImmutableParts:
     """A base class for common functions and methods of an immutable
     object made up of "parts".
@@ -61,12 +70,26 @@ class _ImmutableParts:
         _str: The __str__ representation.
         _args_tuple: The args as a tuple, as they should appear in the
             __repr__ representation.
+        _hash: The hash of `_parts`.
+
+    The constructor must also call `super().__init__()`.
     """
 
     # pylint: disable=no-member
 
+    # these objects are created for every possible move, so use slots
+    # instead of a `__dict__` for each one
+    __slots__ = ("_parts", "_str", "_args_tuple", "_hash", "_repr")
+
+    def __init__(self):
+        # the __repr__ representation is only computed when needed
+        self._repr = None
+
     @classmethod
     def of(cls, obj) -> Self:
+        # most of the time, `obj` is exactly the right class already
+        if obj.__class__ is cls:
+            return obj
         if obj is None:
             return None
         if isinstance(obj, cls):
@@ -91,17 +114,37 @@ class _ImmutableParts:
         return self._str
 
     def __repr__(self):
-        args_str = ", ".join(map(repr, self._args_tuple))
-        return f"{self.__class__.__name__}({args_str})"
+        if self._repr is None:
+            args_str = ", ".join(map(repr, self._args_tuple))
+            self._repr = f"{self.__class__.__name__}({args_str})"
+        return self._repr
 
     def __hash__(self):
-        return hash(self._parts)
+        return self._hash
+
+    # the comparisons are written out rather than using
+    # `functools.total_ordering`, which adds a layer of calls
 
     def __lt__(self, other):
         if isinstance(other, self.__class__):
             return self._parts < other._parts
         return self._parts < other
 
+    def __le__(self, other):
+        if isinstance(other, self.__class__):
+            return self._parts <= other._parts
+        return self._parts <= other
+
+    def __gt__(self, other):
+        if isinstance(other, self.__class__):
+            return self._parts > other._parts
+        return self._parts > other
+
+    def __ge__(self, other):
+        if isinstance(other, self.__class__):
+            return self._parts >= other._parts
+        return self._parts >= other
+
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return self._parts == other._parts
@@ -115,15 +158,71 @@ class _ImmutableParts:
 
 
 class PositionBase(_ImmutableParts):
-    """Position base class."""
+    """Position base class.
+
+    The constructor must also define the property:
+        _index: The position packed into a single int, as
+            `bn * 64 + r * 8 + c` (or `r * 8 + c` for a Position). This
+            has the same ordering as `_pos`.
+    """
+
+    __slots__ = ("_pos", "_code", "_index")
 
     def __init__(self, pos, code):
+        super().__init__()
         self._pos = pos
         self._code = code
+        index = 0
+        for part in pos:
+            index = index * 8 + part
+        self._index = index
 
         self._parts = self._pos
         self._str = self._code
         self._args_tuple = self._pos
+        self._hash = hash(self._parts)
+
+    @classmethod
+    def _make(cls, pos, code) -> Self:
+        """Creates a new instance without going through `__new__()`."""
+        obj = object.__new__(cls)
+        PositionBase.__init__(obj, pos, code)
+        return obj
+
+    def __reduce__(self):
+        # `__new__()` needs the parts as args
+        return (self.__class__, self._pos)
+
+    # `_parts` stays a tuple so that positions can still be compared to
+    # and hashed the same as plain tuples, but positions of the same
+    # class can be compared with their packed ints instead
+
+    __hash__ = _ImmutableParts.__hash__
+
+    def __lt__(self, other):
+        if other.__class__ is self.__class__:
+            return self._index < other._index
+        return super().__lt__(other)
+
+    def __le__(self, other):
+        if other.__class__ is self.__class__:
+            return self._index <= other._index
+        return super().__le__(other)
+
+    def __gt__(self, other):
+        if other.__class__ is self.__class__:
+            return self._index > other._index
+        return super().__gt__(other)
+
+    def __ge__(self, other):
+        if other.__class__ is self.__class__:
+            return self._index >= other._index
+        return super().__ge__(other)
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self._index == other._index
+        return super().__eq__(other)
 
     @classmethod
     def from_code(cls, code: str):
@@ -161,12 +260,22 @@ class Position(PositionBase):
         code (str): The position code (in algebraic notation).
     """
 
+    __slots__ = ()
+
+    def __new__(cls, r, c):
+        """Returns the Position for the given row and column.
+
+        There are only 64 possible positions, so they are all created
+        once and shared.
+        """
+        if not (0 <= r < 8 and 0 <= c < 8):
+            # raises the appropriate error
+            check_brc(r=r, c=c)
+        return _POSITIONS[r * 8 + c]
+
     def __init__(self, r, c):
         """Initializes a Position."""
-        check_brc(r=r, c=c)
-        pos = (r, c)
-        code = _rc_code(r, c)
-        super().__init__(pos, code)
+        # already initialized (see `__new__()`)
 
     @classmethod
     def from_code(cls, code: str) -> "Position":
@@ -198,12 +307,23 @@ class BoardPosition(PositionBase):
         code (str): The position code (in algebraic notation).
     """
 
+    __slots__ = ()
+
+    def __new__(cls, bn, r, c):
+        """Returns the BoardPosition for the given board number, row,
+        and column.
+
+        There are only 128 possible positions, so they are all created
+        once and shared.
+        """
+        if not (bn in (0, 1) and 0 <= r < 8 and 0 <= c < 8):
+            # raises the appropriate error
+            check_brc(bn=bn, r=r, c=c)
+        return _BOARD_POSITIONS[bn * 64 + r * 8 + c]
+
     def __init__(self, bn, r, c):
         """Initializes a BoardPosition."""
-        check_brc(bn=bn, r=r, c=c)
-        pos = (bn, r, c)
-        code = "AB"[bn] + _rc_code(r, c)
-        super().__init__(pos, code)
+        # already initialized (see `__new__()`)
 
     @classmethod
     def from_code(cls, code: str) -> "BoardPosition":
@@ -218,12 +338,11 @@ class BoardPosition(PositionBase):
         if len(code) != 3:
             raise ValueError("`code` must have length 3")
         board = code[0].upper()
-        try:
-            bn = "AB".index(board)
-        except ValueError:
+        bn = ord(board) - ord("A")
+        if bn not in (0, 1):
             raise ValueError(
                 f"Invalid code: board must be A or B (got {board!r})"
-            ) from None
+            )
         r, c = _rc_from_code(code[1:])
         return cls(bn, r, c)
 
@@ -238,6 +357,18 @@ class BoardPosition(PositionBase):
         return self._pos[0]
 
 
+# maps: r * 8 + c -> Position
+_POSITIONS = tuple(
+    Position._make((r, c), _rc_code(r, c)) for r in range(8) for c in range(8)
+)
+# maps: bn * 64 + r * 8 + c -> BoardPosition
+_BOARD_POSITIONS = tuple(
+    BoardPosition._make((bn, r, c), _BRC_CODES[bn * 64 + r * 8 + c])
+    for bn in range(2)
+    for r in range(8)
+    for c in range(8)
+)
+
 # =============================================================================
 
 
@@ -250,18 +381,30 @@ class Move(_ImmutableParts):
         capture_pos (BoardPosition): The capture position.
         result_pos (BoardPosition): The piece's resulting position,
             after teleporting.
+
+    Methods:
+        encode() -> int
+            Returns the move encoded as a single int.
     """
 
+    __slots__ = ("_pos", "_target", "_capture_pos", "_result_pos")
+
     def __init__(self, pos: BoardPosition, target: Position):
         """Initializes a Move."""
+        super().__init__()
         self._pos = BoardPosition.of(pos)
         self._target = Position.of(target)
-        self._capture_pos = BoardPosition(self._pos.bn, *self._target)
-        self._result_pos = BoardPosition(1 - self._pos.bn, *self._target)
+        # both positions are already validated, so index the shared
+        # positions directly
+        bn = self._pos._pos[0]
+        target_index = self._target._index
+        self._capture_pos = _BOARD_POSITIONS[bn * 64 + target_index]
+        self._result_pos = _BOARD_POSITIONS[(1 - bn) * 64 + target_index]
 
         self._parts = (self._pos, self._target)
         self._str = f"{self._pos}-{self._target}"
         self._args_tuple = self._parts
+        self._hash = hash(self._parts)
 
     @property
     def pos(self) -> BoardPosition:
@@ -286,6 +429,15 @@ class Move(_ImmutableParts):
         """The piece's resulting position, after teleporting."""
         return self._result_pos
 
+    def encode(self) -> int:
+        """Returns the move encoded as a single int.
+
+        The encoding is unique for each move: the piece position as
+        `bn * 64 + r * 8 + c`, followed by 6 bits for the target as
+        `tr * 8 + tc`.
+        """
+        return self._pos._index * 64 + self._target._index
+
 
 class PieceMove(Move):
     """Represents a possible move for a piece, which is a Move that
@@ -300,6 +452,8 @@ class PieceMove(Move):
         piece_moved (Piece): The piece that is being moved.
     """
 
+    __slots__ = ("_piece_moved",)
+
     def __init__(self, pos: BoardPosition, target: Position, piece: "Piece"):
         """Initializes a PieceMove."""
         super().__init__(pos, target)
@@ -330,6 +484,8 @@ class PieceMoved(PieceMove):
             if given.
     """
 
+    __slots__ = ("_move_captured", "_piece_captured")
+
     def __init__(
         self,
         pos: BoardPosition,
@@ -340,7 +496,6 @@ class PieceMoved(PieceMove):
         """Initializes a PieceMoved."""
         super().__init__(pos, target, piece)
 
-        self._piece_moved = piece
         self._move_captured = captured is not None
         self._piece_captured = captured
 
@@ -25,7 +25,13 @@ class _EnumWIthTitle(_enum.Enum):
 
     def title(self) -> str:
         """Returns the enum name as a title string."""
-        return self.name.title()
+        return self.title_name
+
+
+def _set_names(enum_cls, attr, to_name):
+    # the names never change, so precompute them
+    for member in enum_cls:
+        setattr(member, attr, to_name(member.name))
 
 
 class Color(_EnumWIthTitle):
@@ -36,11 +42,24 @@ class Color(_EnumWIthTitle):
 
     def abbr(self) -> str:
         """Returns the first letter of the color."""
-        return self.name[0]
+        return self.abbr_upper
 
     def other(self) -> "Color":
         """Returns the other color."""
-        return Color(1 - self.value)
+        return self.other_color
+
+
+# precompute the per-color lookups as plain member attributes, so hot
+# paths can read them directly instead of calling a method
+Color.WHITE.index = 0
+Color.BLACK.index = 1
+Color.WHITE.other_color = Color.BLACK
+Color.BLACK.other_color = Color.WHITE
+Color.WHITE.abbr_upper = "W"
+Color.BLACK.abbr_upper = "B"
+Color.WHITE.abbr_lower = "w"
+Color.BLACK.abbr_lower = "b"
+_set_names(Color, "title_name", str.title)
 
 
 class PieceType(_EnumWIthTitle):
@@ -54,6 +73,9 @@ class PieceType(_EnumWIthTitle):
     PAWN = "P"
 
 
+_set_names(PieceType, "title_name", str.title)
+
+
 class PromoteType(_enum.Enum):
     """The piece types that can be promoted to."""
 
@@ -65,10 +87,13 @@ class PromoteType(_enum.Enum):
     @classmethod
     def by_index(cls, i: int) -> "PromoteType":
         """Returns the PromoteType at index i."""
-        for j, p_type in enumerate(cls):
-            if j == i:
-                return p_type
-        raise IndexError(f"invalid index {i} for {cls.__name__}")
+        if not 0 <= i < len(_PROMOTE_TYPES):
+            raise IndexError(f"invalid index {i} for {cls.__name__}")
+        return _PROMOTE_TYPES[i]
+
+
+# the promote types in order, for indexing
+_PROMOTE_TYPES = tuple(PromoteType)
 
 
 class EndGameState(_enum.Enum):
@@ -82,15 +107,26 @@ class EndGameState(_enum.Enum):
 
     def human_readable(self) -> str:
         """Returns a human-readable name of this state."""
-        return self.name.replace("_", " ").title()
+        return self.human_readable_name
 
     def is_draw(self) -> bool:
         """Returns whether the current state is a type of draw."""
-        return self in (
-            self.INSUFFICIENT_MATERIAL_DRAW,
-            self.FIFTY_MOVE_DRAW,
-            self.THREEFOLD_REPETITION_DRAW,
-        )
+        return self in _DRAW_STATES
+
+
+_set_names(
+    EndGameState,
+    "human_readable_name",
+    lambda name: name.replace("_", " ").title(),
+)
+
+_DRAW_STATES = frozenset(
+    (
+        EndGameState.INSUFFICIENT_MATERIAL_DRAW,
+        EndGameState.FIFTY_MOVE_DRAW,
+        EndGameState.THREEFOLD_REPETITION_DRAW,
+    )
+)
 
 
 # =============================================================================
@@ -101,19 +137,26 @@ def check_brc(bn=None, r=None, c=None, tr=None, tc=None):
 
     Raises `ValueError` if any conditions are not satisfied.
     """
+    # this is called for every position, so the checks are unrolled
+    # rather than looping over the args
     if bn is not None and bn not in (0, 1):
         raise ValueError("`bn` must be 0 or 1")
-    for name, val in (("r", r), ("c", c), ("tr", tr), ("tc", tc)):
-        if val is None:
-            continue
-        if not 0 <= val < 8:
-            raise ValueError(f"`{name}` must be bounded within [0, 7]")
+    if r is not None and not 0 <= r < 8:
+        raise ValueError("`r` must be bounded within [0, 7]")
+    if c is not None and not 0 <= c < 8:
+        raise ValueError("`c` must be bounded within [0, 7]")
+    if tr is not None and not 0 <= tr < 8:
+        raise ValueError("`tr` must be bounded within [0, 7]")
+    if tc is not None and not 0 <= tc < 8:
+        raise ValueError("`tc` must be bounded within [0, 7]")
 
 
 def check_brc_bool(bn=None, r=None, c=None, tr=None, tc=None) -> bool:
     """Returns True if all the given args are within the proper bounds."""
-    try:
-        check_brc(bn, r, c, tr, tc)
-        return True
-    except ValueError:
-        return False
+    return (
+        (bn is None or bn in (0, 1))
+        and (r is None or 0 <= r < 8)
+        and (c is None or 0 <= c < 8)
+        and (tr is None or 0 <= tr < 8)
+        and (tc is None or 0 <= tc < 8)
+    )
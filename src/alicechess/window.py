@@ -4,9 +4,12 @@ Window class.
 
 # =============================================================================
 
-import math
+import functools
+import queue
+import threading
 import tkinter as _tk
 import tkinter.font as _TkFont
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
@@ -56,6 +59,9 @@ BUTTON_PADDING = 5
 
 POSSIBLE_DOT_RADIUS = 5
 
+# How often to check whether a non-human player has made its move (in ms).
+THINKING_POLL_INTERVAL = 50
+
 # Board colors
 WHITE_COLOR = "white"
 BLACK_COLOR = "gray"
@@ -73,6 +79,18 @@ PICTURE_EXT = ".png"
 # =============================================================================
 
 
+# the available fonts don't change while running, so only search for
+# one once (for the first window)
+@functools.cache
+def _find_font() -> Optional[str]:
+    """Returns the first available font in `FONTS`, or None."""
+    families = set(_TkFont.families())
+    for font in FONTS:
+        if font in families:
+            return font
+    return None
+
+
 def _button_width(font: _TkFont.Font, text: str) -> int:
     return BUTTON_PADDING + font.measure(text) + BUTTON_PADDING
 
@@ -93,13 +111,13 @@ def _black_on_button(game_state: GameState) -> bool:
 
 
 def _brc_to_xy(
-    game_state: GameState, pos: BoardPosition, *, center: bool
+    black_on_button: bool, pos: BoardPosition, *, center: bool
 ) -> Tuple[int, int]:
     """Calculates the xy-coordinates of the top-left or center of the
     square for the given board position.
     """
     bn, r, c = pos
-    if _black_on_button(game_state):
+    if black_on_button:
         # flip the coordinates
         r = 7 - r
         c = 7 - c
@@ -112,18 +130,18 @@ def _brc_to_xy(
 
 
 def _xy_to_brc(
-    game_state: GameState, x: int, y: int
+    black_on_button: bool, x: int, y: int
 ) -> Optional[BoardPosition]:
     """Calculates the board position of the given xy-coordinates."""
     bn = 0
-    # int truncates (toward 0), so must use `math.floor()` to account
+    # int truncates (toward 0), so must use floor division to account
     # for possible negative numbers
-    r = math.floor((y - Y_OFFSET) / SQUARE_SIZE)
-    c = math.floor((x - X_OFFSET) / SQUARE_SIZE)
+    r = (y - Y_OFFSET) // SQUARE_SIZE
+    c = (x - X_OFFSET) // SQUARE_SIZE
     if c >= 8:  # try other board
         bn = 1
-        c = math.floor((x - X_OFFSET2) / SQUARE_SIZE)
-    if _black_on_button(game_state):
+        c = (x - X_OFFSET2) // SQUARE_SIZE
+    if black_on_button:
         # flip the coordinates
         r = 7 - r
         c = 7 - c
@@ -138,6 +156,17 @@ def _within_coords(coords, x, y):
     return x1 <= x <= x2 and y1 <= y <= y2
 
 
+def _reset_all_squares(canvas: _tk.Canvas):
+    """Resets every square on the board.
+
+    This is the same as calling `Square.reset()` on every square, but
+    only takes a canvas call per tag instead of two per square.
+    """
+    canvas.itemconfig("white_square", fill=WHITE_COLOR)
+    canvas.itemconfig("black_square", fill=BLACK_COLOR)
+    canvas.itemconfig("possible_dot", state="hidden")
+
+
 # =============================================================================
 
 
@@ -151,20 +180,24 @@ class Square:
         possible(): Sets this square as a possible move.
     """
 
-    def __init__(
-        self,
-        game_state: GameState,
-        canvas: _tk.Canvas,
-        bn: int,
-        r: int,
-        c: int,
-    ):
+    def __init__(self, canvas: _tk.Canvas, r: int, c: int, x: float, y: float):
         self._canvas = canvas
-        self._color = WHITE_COLOR if (r + c) % 2 == 0 else BLACK_COLOR
+        if (r + c) % 2 == 0:
+            self._color = WHITE_COLOR
+            color_tag = "white_square"
+        else:
+            self._color = BLACK_COLOR
+            color_tag = "black_square"
 
-        x, y = _brc_to_xy(game_state, (bn, r, c), center=False)
+        # the ids are kept for changing a single square, since looking
+        # up an item by a tag has to search through every item
         self._square = canvas.create_rectangle(
-            x, y, x + SQUARE_SIZE, y + SQUARE_SIZE, fill=self._color
+            x,
+            y,
+            x + SQUARE_SIZE,
+            y + SQUARE_SIZE,
+            fill=self._color,
+            tags=("square", color_tag),
         )
         x_mid = x + HALF_SQUARE_SIZE
         y_mid = y + HALF_SQUARE_SIZE
@@ -260,7 +293,10 @@ class Window:
         self._undo_state = None
         self._find_undo_state()
 
-        if _black_on_button(game_state):
+        # the players never change (even when restarting), so this only
+        # has to be calculated once
+        self._black_on_button = _black_on_button(game_state)
+        if self._black_on_button:
 
             def label(i):
                 num = str(8 - i)
@@ -278,16 +314,15 @@ class Window:
         self._tk.title(self.TITLE)
 
         # find font to use
-        self._font = None
-        families = set(_TkFont.families())
-        for font in FONTS:
-            if font in families:
-                self._font = font
-                break
+        self._font = _find_font()
         font30 = (self._font, 30)
         font20 = (self._font, 20)
         self._font15 = _TkFont.Font(self._tk, (self._font, 15))
 
+        # everything is drawn on this one canvas: Tk canvases aren't
+        # transparent, so the static board can't be put on a separate
+        # canvas under the pieces. the stacking order is kept with tags
+        # instead (see `_update_pieces()`).
         self._canvas = canvas = _tk.Canvas(
             self._tk, width=WIDTH, height=HEIGHT
         )
@@ -301,10 +336,8 @@ class Window:
         # piece images
         # 5:4 scale for image:square sizes
         img_size = (int(SQUARE_SIZE * 5 / 4),) * 2
-        # maps: color -> piece type -> image object
-        self._images: Dict[Color, Dict[PieceType, ImageTk.PhotoImage]] = {}
+        image_paths = []
         for color in Color:
-            color_images = {}
             for piece_type in PieceType:
                 image_path = (
                     PICTURE_FOLDER
@@ -314,22 +347,48 @@ class Window:
                     raise FileNotFoundError(
                         f"Piece image file not found: {image_path}"
                     )
-                img = Image.open(image_path)
-                img = img.resize(img_size, Image.ANTIALIAS)
-                color_images[piece_type] = ImageTk.PhotoImage(img)
-            self._images[color] = color_images
+                image_paths.append((color, piece_type, image_path))
+
+        def load_image(image_path):
+            img = Image.open(image_path)
+            return img.resize(img_size, Image.Resampling.LANCZOS)
+
+        # Pillow releases the GIL while decoding and resizing, so load the
+        # images in parallel (but the Tk images must be made here, in the
+        # Tk thread)
+        with ThreadPoolExecutor() as executor:
+            imgs = executor.map(
+                load_image, (image_path for _, _, image_path in image_paths)
+            )
+        # maps: (color, piece type) -> image object
+        self._images: Dict[Tuple[Color, PieceType], ImageTk.PhotoImage] = {}
+        for (color, piece_type, _), img in zip(image_paths, imgs):
+            self._images[color, piece_type] = ImageTk.PhotoImage(img)
 
         # maps: piece id -> image id
         self._piece_images: Dict[int, int] = {}
+        # maps: image id -> (position, piece type) being shown
+        self._shown_pieces: Dict[int, Tuple[BoardPosition, PieceType]] = {}
+
+        # the coordinates only depend on the board position, so
+        # calculate them all once
+        # maps: board position -> (x, y, x_mid, y_mid) of the square
+        self._square_xys: Dict[BoardPosition, Tuple[float, ...]] = {}
+        for bn in range(2):
+            for r in range(8):
+                for c in range(8):
+                    pos = (bn, r, c)
+                    self._square_xys[pos] = _brc_to_xy(
+                        self._black_on_button, pos, center=False
+                    ) + _brc_to_xy(self._black_on_button, pos, center=True)
 
         # draw boards
         self._squares: Dict[BoardPosition, Square] = {}
         for bn in range(2):
             for r in range(8):
                 for c in range(8):
-                    self._squares[bn, r, c] = Square(
-                        game_state, canvas, bn, r, c
-                    )
+                    x, y, _, _ = self._square_xys[bn, r, c]
+                    self._squares[bn, r, c] = Square(canvas, r, c, x, y)
 
         # labels
         board1_x = X_OFFSET - LABEL_OFFSET
@@ -363,7 +422,7 @@ class Window:
                 canvas.create_image(
                     x,
                     bottom_y,
-                    image=self._images[color][piece_type],
+                    image=self._images[color, piece_type],
                     tags=(tag, "promotions"),
                 )
                 x += SQUARE_SIZE
@@ -404,12 +463,22 @@ class Window:
         self._hide("undo")
 
         # pause button
-        self._pause_button_coords = (
-            WIDTH - (10 + _button_width(self._font15, "Pause")),
-            10,
-            WIDTH - 10,
-            40,
-        )
+        # the text switches between "Pause" and "Unpause", so measure
+        # both once instead of on every switch
+        # maps: button text -> (button coords, text coords)
+        self._pause_button_layouts: Dict[str, Tuple[tuple, tuple]] = {}
+        for button_text in ("Pause", "Unpause"):
+            coords = (
+                WIDTH - (10 + _button_width(self._font15, button_text)),
+                10,
+                WIDTH - 10,
+                40,
+            )
+            self._pause_button_layouts[button_text] = (
+                coords,
+                _button_middle(coords),
+            )
+        self._pause_button_coords = self._pause_button_layouts["Pause"][0]
         self._pause_button, self._pause_text = _create_button(
             self._pause_button_coords, "Pause", tags=("pause",)
         )
@@ -420,6 +489,12 @@ class Window:
         self._last_move = None
         self._selected = None
         self._other_player_callback = None
+        # the non-human player thinking in a separate thread, as a tuple
+        # of (game state, results queue, thread), or None
+        self._thinking = None
+        # incremented whenever the non-human player is stopped, so that
+        # a stopped player's move is never used
+        self._think_generation = 0
 
     def _print(self, *args, **kwargs):
         """Prints something for debugging."""
@@ -441,7 +516,11 @@ class Window:
 
     def _stop_non_human_player(self):
         """Stops any non-human player from thinking."""
-        # stop any non-human player from thinking
+        # a thread can't be killed, so if the player is already thinking,
+        # its thread finishes on its own. bumping the generation makes
+        # sure its move is dropped, and `_start_thinking()` won't start
+        # another thread until it's done.
+        self._think_generation += 1
         if self._other_player_callback is not None:
             self._canvas.after_cancel(self._other_player_callback)
             self._other_player_callback = None
@@ -460,8 +539,7 @@ class Window:
         # reset squares
         self._last_move = None
         self._selected = None
-        for square in self._squares.values():
-            square.reset()
+        _reset_all_squares(self._canvas)
 
         # reset other visual stuff
         self._hide("undo")
@@ -484,44 +562,83 @@ class Window:
     ):
         if pos is None:
             pos = piece.pos
-        x, y = _brc_to_xy(self._game, pos, center=True)
         if img_id is None:
             # create new image
+            _, _, x, y = self._square_xys[pos]
             img_id = self._canvas.create_image(
-                x, y, image=self._images[piece.color][piece.type]
+                x, y, image=self._images[piece.color, piece.type]
             )
         else:
-            # move image to proper location
-            self._canvas.coords(img_id, x, y)
-            # update the actual image to be the proper piece type
-            self._canvas.itemconfig(
-                img_id, image=self._images[piece.color][piece.type]
-            )
+            # only touch the canvas for what actually changed, which is
+            # usually just one or two pieces per move
+            shown_pos, shown_type = self._shown_pieces[img_id]
+            if shown_pos != pos:
+                # move image to proper location
+                _, _, x, y = self._square_xys[pos]
+                self._canvas.coords(img_id, x, y)
+            if shown_type is not piece.type:
+                # update the actual image to be the proper piece type
+                self._canvas.itemconfig(
+                    img_id, image=self._images[piece.color, piece.type]
+                )
+        self._shown_pieces[img_id] = (pos, piece.type)
         return img_id
 
+    def _delete_piece_images(self, *img_ids: int):
+        # the canvas can delete all the images in one call
+        self._canvas.delete(*img_ids)
+        for img_id in img_ids:
+            del self._shown_pieces[img_id]
+
     def _update_pieces(self):
-        """Updates the piece images."""
-        piece_images = {}
-        for piece in self._game.yield_all_pieces():
-            img_id = self._piece_images.pop(piece.id, None)
-            piece_images[piece.id] = self._update_piece_image(piece, img_id)
-        for img_id in self._piece_images.values():
-            self._canvas.delete(img_id)
-        self._piece_images = piece_images
+        """Updates the piece images.
 
-        # make sure all the "possible move" dots are above the images
-        self._canvas.lift("possible_dot")
+        Only the pieces that moved, were captured, or changed type are
+        updated on the canvas.
+        """
+        # update the images in place
+        num_pieces = 0
+        created_image = False
+        for piece in self._game.yield_all_pieces():
+            num_pieces += 1
+            img_id = self._piece_images.get(piece.id, None)
+            if img_id is None:
+                created_image = True
+            self._piece_images[piece.id] = self._update_piece_image(
+                piece, img_id
+            )
+        if len(self._piece_images) > num_pieces:
+            # some pieces were captured, so delete their images
+            piece_ids = {piece.id for piece in self._game.yield_all_pieces()}
+            captured_img_ids = [
+                self._piece_images.pop(piece_id)
+                for piece_id in tuple(self._piece_images)
+                if piece_id not in piece_ids
+            ]
+            self._delete_piece_images(*captured_img_ids)
+
+        if created_image:
+            # new images are put on top, so make sure all the "possible
+            # move" dots are above the images
+            self._canvas.lift("possible_dot")
 
     def _unselect_piece(self):
         if self._selected is None:
             return
-        self._squares[self._selected.pos].reset()
-        for move in self._selected.yield_moves():
-            self._squares[move.capture_pos].reset_possible()
+        square = self._squares[self._selected.pos]
+        square.reset()
+        if self._selected.pos == self._last_move:
+            # keep the last move highlighted
+            square.last_move()
+        # hiding every dot with the tag only takes one canvas call, vs
+        # one call per possible move
+        self._hide("possible_dot")
         self._selected = None
 
     def _select_piece(self, piece: Piece):
-        self._print("Selected piece:", piece, "at", piece.pos.debug())
+        if self._debug:
+            # only build the debug string if it will be printed
+            self._print("Selected piece:", piece, "at", piece.pos.debug())
         self._unselect_piece()
         self._selected = piece
         self._squares[self._selected.pos].select()
@@ -552,6 +669,11 @@ class Window:
 
     def _click(self, event: _tk.Event):
         """Handles a click event."""
+        # the click is hit-tested here by its coordinates rather than
+        # with `tag_bind()` on each item: the piece images and dots sit
+        # on top of the squares (so they would get the item events), and
+        # the button rectangles have no fill (so they would only get the
+        # events on their outline). the checks are all just comparisons.
         x, y = event.x, event.y
 
         # check reset button
@@ -574,7 +696,7 @@ class Window:
             if self._undo_state is not None:
                 self._stop_non_human_player()
                 self._game = self._undo_state
-                self._update_pieces()
+                # `_end_turn()` updates the pieces
                 self._end_turn()
             return
 
@@ -601,7 +723,7 @@ class Window:
         if not self._game.current_player.is_human:
             return
 
-        clicked_pos = _xy_to_brc(self._game, x, y)
+        clicked_pos = _xy_to_brc(self._black_on_button, x, y)
         if clicked_pos is None:
             # invalid coords
             return
@@ -631,7 +753,8 @@ class Window:
             return
 
         # make move
-        self._print("Moving selected to:", clicked_pos.debug())
+        if self._debug:
+            self._print("Moving selected to:", clicked_pos.debug())
         try:
             _, r, c = clicked_pos
             move = (self._selected.pos, (r, c))
@@ -653,10 +776,9 @@ class Window:
                     self._game.move.piece_captured.id, None
                 )
                 if img_id is not None:
-                    self._canvas.delete(img_id)
+                    self._delete_piece_images(img_id)
             # reset the piece's possible dots
-            for move in pawn.yield_moves():
-                self._squares[move.capture_pos].reset_possible()
+            self._hide("possible_dot")
             # show promotion images
             self._show(f"{self._selected.color.name.lower()}_promotions")
             return
@@ -689,16 +811,10 @@ class Window:
                 self._hide(self._state_text)
 
         # update button text
-        self._pause_button_coords = (
-            WIDTH - (10 + _button_width(self._font15, button_text)),
-            10,
-            WIDTH - 10,
-            40,
-        )
+        coords, text_coords = self._pause_button_layouts[button_text]
+        self._pause_button_coords = coords
         self._canvas.coords(self._pause_button, self._pause_button_coords)
-        self._canvas.coords(
-            self._pause_text, _button_middle(self._pause_button_coords)
-        )
+        self._canvas.coords(self._pause_text, text_coords)
         self._canvas.itemconfig(self._pause_text, text=button_text)
 
         self._paused = not self._paused
@@ -709,12 +825,7 @@ class Window:
         if self._game.is_game_over():
             return
 
-        def make_turn():
-            self._game = self._game.step()
-            self._print("Non-human player made move:", self._game.move)
-            self._other_player_callback = None
-            self._end_turn()
-
+        generation = self._think_generation
         if not first_move and self._delay > 0:
             if self._game.is_in_check():
                 action = "is in check. Thinking..."
@@ -723,13 +834,97 @@ class Window:
             text = f"{self._game.current_color.title()} {action}"
             self._show(self._state_text, text=text)
             self._other_player_callback = self._canvas.after(
-                self._delay, make_turn
+                self._delay, self._start_thinking, generation
             )
         else:
-            make_turn()
+            self._start_thinking(generation)
+
+    def _start_thinking(self, generation: int):
+        """Starts the non-human player thinking about the current game.
+
+        The player thinks in a separate thread so that the window stays
+        responsive. Tk can only be used from this thread, so the result
+        is passed back through a queue and polled for.
+
+        Only one thread ever thinks at a time, since the players and the
+        game states aren't safe to use from multiple threads at once.
+        """
+        self._other_player_callback = None
+        if generation != self._think_generation:
+            # the player was stopped
+            return
+
+        game = self._game
+        if self._thinking is not None:
+            thinking_game, results, thread = self._thinking
+            if thinking_game is game:
+                # still (or already done) thinking about this state, such
+                # as after pausing and unpausing
+                self._other_player_callback = self._canvas.after(
+                    THINKING_POLL_INTERVAL, self._check_thinking, generation
+                )
+                return
+            if thread.is_alive():
+                # a stopped player is still thinking about an old state,
+                # so wait for it to finish
+                self._other_player_callback = self._canvas.after(
+                    THINKING_POLL_INTERVAL, self._start_thinking, generation
+                )
+                return
+            # the old state's move is dropped, but not its error
+            self._thinking = None
+            _, error = results.get_nowait()
+            if error is not None:
+                raise error
+
+        results = queue.Queue()
+
+        def think():
+            try:
+                results.put((game.step(), None))
+            except Exception as think_error:  # pylint: disable=broad-except
+                results.put((None, think_error))
+
+        thread = threading.Thread(target=think, daemon=True)
+        self._thinking = (game, results, thread)
+        thread.start()
+        self._other_player_callback = self._canvas.after(
+            THINKING_POLL_INTERVAL, self._check_thinking, generation
+        )
+
+    def _check_thinking(self, generation: int):
+        """Checks whether the non-human player is done thinking."""
+        self._other_player_callback = None
+        if generation != self._think_generation:
+            # the player was stopped, so its move is dropped
+            return
+
+        _, results, _ = self._thinking
+        try:
+            next_state, error = results.get_nowait()
+        except queue.Empty:
+            # still thinking
+            self._other_player_callback = self._canvas.after(
+                THINKING_POLL_INTERVAL, self._check_thinking, generation
+            )
+            return
+        self._thinking = None
+        if error is not None:
+            raise error
+        self._game = next_state
+        self._print("Non-human player made move:", self._game.move)
+        self._end_turn()
 
     def _end_turn(self):
-        self._hide(self._state_text, text="")
+        """Updates the window after the game state changed.
+
+        Every caller sets a new game state first, and the updates below
+        only touch what actually changed (see `_update_pieces()`), so
+        this doesn't check whether anything changed at all.
+        """
+        # Tk only redraws the canvas once it's idle, so all the changes
+        # below are drawn together. the state text is only set once, at
+        # the end, so that it doesn't get hidden and then shown again.
 
         self._find_undo_state()
         if self._undo_state is not None:
@@ -740,16 +935,18 @@ class Window:
         self._update_pieces()
 
         self._unselect_piece()
-        if self._last_move is not None:
-            self._squares[self._last_move].reset()
 
         # highlight the last move
         if self._game.prev is None:
             # no last move
-            self._last_move = None
+            last_pos = None
         else:
             last_pos = self._game.move.result_pos
-            self._squares[last_pos].last_move()
+        if last_pos != self._last_move:
+            if self._last_move is not None:
+                self._squares[self._last_move].reset()
+            if last_pos is not None:
+                self._squares[last_pos].last_move()
             self._last_move = last_pos
 
         if self._debug:
@@ -775,6 +972,8 @@ class Window:
                 self._state_text,
                 text=f"{game.current_color.title()} is in check.",
             )
+        else:
+            self._hide(self._state_text, text="")
 
         # initialize next turn
         self._non_human_turn()